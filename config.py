@@ -11,4 +11,63 @@ DB_PASS=os.environ.get("DB_PASS")
 SALT_BEELINE_TEST=os.environ.get("SALT_BEELINE_TEST")
 SALT_BEELINE_PROD=os.environ.get("SALT_BEELINE_PROD")
 SALT_BUBBLES=os.environ.get("SALT_BUBBLES")
-SECRET_FOR_BEELINE=os.environ.get("SECRET_FOR_BEELINE")
\ No newline at end of file
+SECRET_FOR_BEELINE=os.environ.get("SECRET_FOR_BEELINE")
+
+DB_POOL_SIZE=int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW=int(os.environ.get("DB_MAX_OVERFLOW", 5))
+DB_POOL_TIMEOUT=float(os.environ.get("DB_POOL_TIMEOUT", 10))
+DB_POOL_RECYCLE=int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING=os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+# 0 — если между приложением и Postgres стоит pgbouncer в transaction-режиме
+DB_STATEMENT_CACHE_SIZE=int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+DB_COMMAND_TIMEOUT=float(os.environ.get("DB_COMMAND_TIMEOUT", 30))
+DB_STATEMENT_TIMEOUT_MS=int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 30000))
+
+# Реплика для read-only эндпоинтов; без DB_REPLICA_HOST всё читается с primary
+DB_REPLICA_HOST=os.environ.get("DB_REPLICA_HOST")
+DB_REPLICA_PORT=os.environ.get("DB_REPLICA_PORT", DB_PORT)
+DB_REPLICA_NAME=os.environ.get("DB_REPLICA_NAME", DB_NAME)
+DB_REPLICA_USER=os.environ.get("DB_REPLICA_USER", DB_USER)
+DB_REPLICA_PASS=os.environ.get("DB_REPLICA_PASS", DB_PASS)
+# Сколько секунд после записи пользователя его чтения идут на primary
+DB_READ_YOUR_WRITES_TTL=int(os.environ.get("DB_READ_YOUR_WRITES_TTL", 10))
+
+TOKEN_CACHE_SIZE=int(os.environ.get("TOKEN_CACHE_SIZE", 10000))
+TOKEN_CACHE_TTL=float(os.environ.get("TOKEN_CACHE_TTL", 60))
+
+PURCHASE_STATUS_TIMEOUT=float(os.environ.get("PURCHASE_STATUS_TIMEOUT", 18))
+
+# POST /api/game/pay-product: sync — колбэк Билайна применяется в запросе;
+# queue — через Redis Stream и consumer
+PAYMENT_CALLBACK_MODE=os.environ.get("PAYMENT_CALLBACK_MODE", "sync").lower()
+PAYMENT_QUEUE_MAX_BACKLOG=int(os.environ.get("PAYMENT_QUEUE_MAX_BACKLOG", 100000))
+PAYMENT_QUEUE_BATCH=int(os.environ.get("PAYMENT_QUEUE_BATCH", 100))
+PAYMENT_QUEUE_BLOCK_MS=int(os.environ.get("PAYMENT_QUEUE_BLOCK_MS", 1000))
+PAYMENT_QUEUE_RETRY_IDLE_MS=int(os.environ.get("PAYMENT_QUEUE_RETRY_IDLE_MS", 15000))
+PAYMENT_QUEUE_MAX_DELIVERIES=int(os.environ.get("PAYMENT_QUEUE_MAX_DELIVERIES", 5))
+
+BEELINE_API_URL=os.environ.get("BEELINE_API_URL", "https://api.partnerka.beeline.ru")
+BEELINE_HTTP2=os.environ.get("BEELINE_HTTP2", "true").lower() == "true"
+BEELINE_HTTP_TIMEOUT=float(os.environ.get("BEELINE_HTTP_TIMEOUT", 10))
+BEELINE_HTTP_CONNECT_TIMEOUT=float(os.environ.get("BEELINE_HTTP_CONNECT_TIMEOUT", 5))
+BEELINE_HTTP_MAX_CONNECTIONS=int(os.environ.get("BEELINE_HTTP_MAX_CONNECTIONS", 100))
+BEELINE_HTTP_MAX_KEEPALIVE=int(os.environ.get("BEELINE_HTTP_MAX_KEEPALIVE", 20))
+BEELINE_HTTP_KEEPALIVE_EXPIRY=float(os.environ.get("BEELINE_HTTP_KEEPALIVE_EXPIRY", 30))
+
+BEELINE_TOKEN_TTL=float(os.environ.get("BEELINE_TOKEN_TTL", 300))
+BEELINE_TOKEN_CACHE_SIZE=int(os.environ.get("BEELINE_TOKEN_CACHE_SIZE", 10000))
+
+REDIS_HOST=os.environ.get("REDIS_HOST", "redis")
+REDIS_PORT=int(os.environ.get("REDIS_PORT", 6379))
+REDIS_DB=int(os.environ.get("REDIS_DB", 0))
+REDIS_MAX_CONNECTIONS=int(os.environ.get("REDIS_MAX_CONNECTIONS", 100))
+REDIS_POOL_TIMEOUT=float(os.environ.get("REDIS_POOL_TIMEOUT", 5))
+REDIS_WAIT_MAX_CONNECTIONS=int(os.environ.get("REDIS_WAIT_MAX_CONNECTIONS", 100))
+
+CATALOG_CACHE_TTL=float(os.environ.get("CATALOG_CACHE_TTL", 60))
+EVENTS_LISTING_MAX_AGE=float(os.environ.get("EVENTS_LISTING_MAX_AGE", 300))
+EVENT_ARCHIVE_INTERVAL=float(os.environ.get("EVENT_ARCHIVE_INTERVAL", 60))
+EVENT_ARCHIVE_BATCH=int(os.environ.get("EVENT_ARCHIVE_BATCH", 5000))
+
+LEADERBOARD_CACHE_TTL=float(os.environ.get("LEADERBOARD_CACHE_TTL", 2))
+LEADERBOARD_CACHE_MIN_AGE=float(os.environ.get("LEADERBOARD_CACHE_MIN_AGE", 0.5))
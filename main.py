@@ -1,14 +1,21 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import APIKeyHeader
 from starlette.middleware.cors import CORSMiddleware
 
+from config import PAYMENT_CALLBACK_MODE
 from src.api.routers import all_routers
+from src.business_logic.payment_queue import payment_callback_queue
 from src.database.migrations import (
     ensure_all_tables_exist,
     ensure_schema_is_up_to_date,
 )
 from src.database.seeds import ensure_master_access_token
+from src.infra.http_client import BeelineHttpClient
+from src.infra.radis import close_redis
+from src.infra.scheduler import start_scheduler, stop_scheduler
+from src.infra.token_cache import token_cache
 
 # ─── Swagger метаданные ───────────────────────────────────────────────
 tags_metadata = [
@@ -28,6 +35,8 @@ app = FastAPI(
     docs_url="/docs",
     openapi_tags=tags_metadata,
     debug=True,
+    # orjson для всех ответов; доверенные данные отдаются через src.infra.responses
+    default_response_class=ORJSONResponse,
 )
 
 # ─── CORS ─────────────────────────────────────────────────────────────
@@ -52,6 +61,56 @@ async def _run_db_migrations() -> None:
     await ensure_all_tables_exist()
     await ensure_master_access_token()
 
+
+@app.on_event("startup")
+async def _start_token_cache_listener() -> None:
+    """Subscribe to cross-worker token cache invalidations."""
+
+    token_cache.start_listener()
+
+
+@app.on_event("shutdown")
+async def _stop_token_cache_listener() -> None:
+    await token_cache.stop_listener()
+
+
+@app.on_event("startup")
+async def _start_scheduler() -> None:
+    """Run background jobs (event archival) outside the request path."""
+
+    start_scheduler()
+
+
+@app.on_event("shutdown")
+async def _stop_scheduler() -> None:
+    stop_scheduler()
+
+
+@app.on_event("startup")
+async def _start_payment_consumer() -> None:
+    """Consume queued Beeline payment callbacks (PAYMENT_CALLBACK_MODE=queue)."""
+
+    if PAYMENT_CALLBACK_MODE == "queue":
+        payment_callback_queue.start()
+
+
+@app.on_event("shutdown")
+async def _stop_payment_consumer() -> None:
+    await payment_callback_queue.stop()
+
+
+@app.on_event("startup")
+async def _start_http_clients() -> None:
+    """Open the shared keep-alive client for the Beeline partner API."""
+
+    await BeelineHttpClient.startup()
+
+
+@app.on_event("shutdown")
+async def _stop_http_clients() -> None:
+    await BeelineHttpClient.shutdown()
+    await close_redis()
+
 # ─── примеры cURL прямо в Swagger ─────────────────────────────────────
 def custom_openapi():
     if app.openapi_schema:
@@ -0,0 +1,67 @@
+"""Add unique (event_id, user_id) and (event_id, result) index to event_ratings.
+
+Revision ID: 5d2e8b7c41a9
+Revises: 3a93f942f3bd
+Create Date: 2026-10-18
+
+Duplicate rows for the same (event_id, user_id) are merged first: results are
+summed into the oldest row, exactly as submit_event_result accumulates them.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5d2e8b7c41a9"
+down_revision = "3a93f942f3bd"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        WITH merged AS (
+          SELECT MIN(id) AS keep_id, SUM(result) AS total
+          FROM event_ratings
+          GROUP BY event_id, user_id
+          HAVING COUNT(*) > 1
+        )
+        UPDATE event_ratings r
+           SET result = merged.total
+          FROM merged
+         WHERE r.id = merged.keep_id;
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM event_ratings r
+         USING event_ratings k
+         WHERE r.event_id = k.event_id
+           AND r.user_id = k.user_id
+           AND r.id > k.id;
+        """
+    )
+    op.execute(
+        """
+        DO $$
+        BEGIN
+          IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint WHERE conname = 'uq_event_ratings_event_user'
+          ) THEN
+            ALTER TABLE event_ratings
+              ADD CONSTRAINT uq_event_ratings_event_user UNIQUE (event_id, user_id);
+          END IF;
+        END $$;
+        """
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_event_ratings_event_result "
+        "ON event_ratings (event_id, result)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_event_ratings_event_result")
+    op.execute(
+        "ALTER TABLE event_ratings DROP CONSTRAINT IF EXISTS uq_event_ratings_event_user"
+    )
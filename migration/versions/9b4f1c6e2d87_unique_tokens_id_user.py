@@ -0,0 +1,37 @@
+"""Make tokens.id_user unique (one token per user).
+
+Revision ID: 9b4f1c6e2d87
+Revises: 5d2e8b7c41a9
+Create Date: 2026-10-18
+
+The initial schema created ix_tokens_id_user as a plain index, while the model
+declares it unique. The login upsert relies on ON CONFLICT (id_user), so extra
+tokens are removed (the most recent one per user is kept) and the index is
+rebuilt as unique.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9b4f1c6e2d87"
+down_revision = "5d2e8b7c41a9"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM tokens t
+         USING tokens newer
+         WHERE t.id_user = newer.id_user
+           AND t.id < newer.id;
+        """
+    )
+    op.execute("DROP INDEX IF EXISTS ix_tokens_id_user")
+    op.execute("CREATE UNIQUE INDEX ix_tokens_id_user ON tokens (id_user)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tokens_id_user")
+    op.execute("CREATE INDEX ix_tokens_id_user ON tokens (id_user)")
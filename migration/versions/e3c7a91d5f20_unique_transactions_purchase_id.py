@@ -0,0 +1,38 @@
+"""Make transactions.purchaseId unique.
+
+Revision ID: e3c7a91d5f20
+Revises: 9b4f1c6e2d87
+Create Date: 2026-10-18
+
+Databases bootstrapped through create_all() got ix_transactions_purchaseId as a
+plain index. The payment callback relies on one row per purchaseId, so later
+duplicates are renamed to "<purchaseId>#dup<id>" (kept for audit, never matched
+by a callback) and the index is rebuilt as unique.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e3c7a91d5f20"
+down_revision = "9b4f1c6e2d87"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE transactions t
+           SET "purchaseId" = t."purchaseId" || '#dup' || t.id
+          FROM transactions keep
+         WHERE keep."purchaseId" = t."purchaseId"
+           AND keep.id < t.id;
+        """
+    )
+    op.execute('DROP INDEX IF EXISTS "ix_transactions_purchaseId"')
+    op.execute('CREATE UNIQUE INDEX "ix_transactions_purchaseId" ON transactions ("purchaseId")')
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS "ix_transactions_purchaseId"')
+    op.execute('CREATE INDEX "ix_transactions_purchaseId" ON transactions ("purchaseId")')
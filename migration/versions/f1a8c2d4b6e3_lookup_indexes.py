@@ -0,0 +1,49 @@
+"""Add lookup indexes for purchase history, pending products, archives and rewards.
+
+Revision ID: f1a8c2d4b6e3
+Revises: e3c7a91d5f20
+Create Date: 2026-10-18
+
+- transactions (id_user, created_at DESC, id DESC): purchase history is filtered
+  by user and ordered newest first, so the index also serves keyset pages.
+- unadded_product (id_user, id): pending purchases of a user in arrival order.
+- event_history (event_id, ended_at): latest archive per event (DISTINCT ON).
+- unclaimed_rewards (event_id): re-issuing rewards on archival deletes by event;
+  per-user lookups are already covered by uq_reward_user_event (user_id, event_id).
+
+event_ratings lookups by event_id are covered by ix_event_ratings_event_result.
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f1a8c2d4b6e3"
+down_revision = "e3c7a91d5f20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_transactions_user_created "
+        "ON transactions (id_user, created_at DESC, id DESC)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_unadded_product_user "
+        "ON unadded_product (id_user, id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_event_history_event_ended "
+        "ON event_history (event_id, ended_at)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_unclaimed_rewards_event "
+        "ON unclaimed_rewards (event_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_unclaimed_rewards_event")
+    op.execute("DROP INDEX IF EXISTS ix_event_history_event_ended")
+    op.execute("DROP INDEX IF EXISTS ix_unadded_product_user")
+    op.execute("DROP INDEX IF EXISTS ix_transactions_user_created")
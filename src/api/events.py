@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Header, HTTPException, Query, Body
+import math
+
+from fastapi import APIRouter, Header, HTTPException, Query, Body, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.events.listing import EventListingCache
 from src.events.repository import EventRatingCore
-from src.database.connection import get_async_session
+from src.database.connection import unit_of_work
+from src.database.routing import read_session
 from src.business_logic.token import TokenCore
+from src.infra.responses import trusted_json
 from src.events.DTO import (
+    CurrentUserInfo,
     EventPublicDTO,
     LeaderboardResponse,
 )
@@ -10,46 +17,60 @@ from src.events.DTO import (
 router = APIRouter(prefix="/api/event", tags=["Events"])
 
 
+def _current_user_info(entry: dict | None) -> dict | None:
+    """Запись игрока в форме CurrentUserInfo (без замаскированного телефона)."""
+    if entry is None:
+        return None
+    return {key: entry[key] for key in CurrentUserInfo.model_fields}
+
+
 @router.get("/current", response_model=list[EventPublicDTO], response_model_exclude_none=True)
-async def get_current_events() -> list[EventPublicDTO]:
-    async with get_async_session() as session:
-        core = EventRatingCore(session)
-        return await core.get_current_events_with_prizes()
+async def get_current_events(if_none_match: str | None = Header(default=None)):
+    # готовые байты из снапшота; БД трогаем только при пересборке
+    listing = await EventListingCache.get()
+    return listing.response(if_none_match)
 
 
 @router.get("/leaderboard", response_model=LeaderboardResponse)
 async def get_leaderboard(
     event_id: int = Query(..., ge=1, description="ID события"),
     limit: int = Query(10, ge=1, le=100, description="Сколько пользователей вернуть в топ-списке"),
+    offset: int | None = Query(
+        None, ge=0, description="С какой позиции рейтинга начинать страницу (по умолчанию 0)"
+    ),
+    around_me: int | None = Query(
+        None, ge=1, le=50, description="Сколько соседей сверху и снизу от игрока вернуть в around"
+    ),
+    after: str | None = Query(
+        None, description="next_after прошлой страницы: '<place>,<result>,<user_id>' её последней строки"
+    ),
     accessToken: str | None = Header(None),
+    session: AsyncSession = Depends(read_session),
 ):
     if not accessToken:
         raise HTTPException(status_code=401, detail="NO_TOKEN")
 
-    async with get_async_session() as session:
-        # Используем токен как в проекте
-        user = await TokenCore.get_user_by_token(accessToken)
-        if not user:
-            raise HTTPException(status_code=401, detail="INVALID_TOKEN")
+    # Используем токен как в проекте
+    user = await TokenCore.get_user_by_token(accessToken)
+    if not user:
+        raise HTTPException(status_code=401, detail="INVALID_TOKEN")
 
-        top, cur = await EventRatingCore(session).get_leaderboard(
-            event_id=event_id,
-            current_user_id=user.id,
-            top_n=limit,
-        )
-        return {
-            "top": [
-                {
-                    "user_id": r["user_id"],
-                    "result": r["result"],
-                    "user_name": r["user_name"],
-                    "place": r["place"],
-                    "rewards": r["rewards"],
-                }
-                for r in top
-            ],
-            "current_user": cur,
+    page, cur, around = await EventRatingCore(session).get_leaderboard(
+        event_id=event_id,
+        current_user_id=user.id,
+        top_n=limit,
+        offset=offset,
+        around_me=around_me,
+        after=after,
+    )
+    # строки собраны _leaderboard_entry в форме LeaderboardEntry — без повторной валидации
+    return trusted_json(
+        {
+            **page,
+            "current_user": _current_user_info(cur),
+            "around": around,
         }
+    )
 
 
 @router.post("/result")
@@ -57,19 +78,23 @@ async def submit_event_result(
     event_id: int = Query(..., ge=1),
     accessToken: str | None = Header(None),
     body: float = Body(..., description="Добавочный результат"),
+    session: AsyncSession = Depends(unit_of_work),
 ):
+    # json.loads пропускает NaN/Infinity (allow_inf_nan у Body не действует) — в рейтинг их не пускаем
+    if not math.isfinite(body):
+        raise HTTPException(status_code=422, detail="result must be a finite number")
+
     if not accessToken:
         raise HTTPException(status_code=401, detail="NO_TOKEN")
 
-    async with get_async_session() as session:
-        user = await TokenCore.get_user_by_token(accessToken)
-        if not user:
-            raise HTTPException(status_code=401, detail="INVALID_TOKEN")
+    user = await TokenCore.get_user_by_token(accessToken)
+    if not user:
+        raise HTTPException(status_code=401, detail="INVALID_TOKEN")
 
-        new_total, place = await EventRatingCore(session).submit_event_result(
-            user_id=user.id,
-            event_id=event_id,
-            result=body,
-        )
-        # Вернули старый формат:
-        return {"result": new_total, "place": place}
+    new_total, place = await EventRatingCore(session).submit_event_result(
+        user_id=user.id,
+        event_id=event_id,
+        result=body,
+    )
+    # Вернули старый формат:
+    return {"result": new_total, "place": place}
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Header, HTTPException, Body, status
+from fastapi import APIRouter, Header, HTTPException, Body, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database.connection import get_async_session
+from src.database.connection import unit_of_work
+from src.database.routing import read_session
 from src.business_logic.token import TokenCore
+from src.infra.responses import trusted_json
 from src.prizes.prizes_repository import PrizesCore
 
 router = APIRouter(
@@ -12,7 +14,8 @@ router = APIRouter(
 
 @router.get("/unclaimed")
 async def get_unclaimed_rewards(
-    accessToken: str | None = Header(default=None)
+    accessToken: str | None = Header(default=None),
+    session: AsyncSession = Depends(read_session),
 ):
     """
     Все незабранные призы текущего пользователя.
@@ -20,9 +23,10 @@ async def get_unclaimed_rewards(
     user = await TokenCore.get_user_by_token(accessToken)
     user_id = user.id
 
-    async with get_async_session() as session:
-        rewards = await PrizesCore(session).get_unclaimed_rewards(user_id)
-        return [
+    rewards = await PrizesCore(session).get_unclaimed_rewards(user_id)
+    # поля из БД, datetime orjson сериализует сам — jsonable_encoder не нужен
+    return trusted_json(
+        [
             {
                 "reward_id": r.id,
                 "event_id": r.event_id,
@@ -32,12 +36,14 @@ async def get_unclaimed_rewards(
             }
             for r in rewards
         ]
+    )
 
 
 @router.post("/claim")
 async def claim_reward(
     prize_id: int = Body(...),
-    accessToken: str | None = Header(default=None)
+    accessToken: str | None = Header(default=None),
+    session: AsyncSession = Depends(unit_of_work),
 ):
     """
     Забрать конкретный приз по `prize_id`.
@@ -45,22 +51,18 @@ async def claim_reward(
     user = await TokenCore.get_user_by_token(accessToken)
     user_id = user.id
 
-    async with get_async_session() as session:
-        prize = await PrizesCore(session).claim_reward(user_id, prize_id)
-        if not prize:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Prize not found"
-            )
+    prize = await PrizesCore(session).claim_reward(user_id, prize_id)
+    if not prize:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Prize not found"
+        )
 
-        # фиксируем удаление в БД
-        await session.commit()
-
-        # возвращаем данные забранного приза
-        return {
-            "reward_id": prize.id,
-            "event_id": prize.event_id,
-            "place": prize.place,
-            "rewards": prize.rewards,
-            "created": prize.created_at,
-        }
+    # возвращаем данные забранного приза
+    return {
+        "reward_id": prize.id,
+        "event_id": prize.event_id,
+        "place": prize.place,
+        "rewards": prize.rewards,
+        "created": prize.created_at,
+    }
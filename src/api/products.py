@@ -1,4 +1,4 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
 
 from src.business_logic.product import ProductCore
 
@@ -10,6 +10,6 @@ router = APIRouter(
 
 
 @router.get('')
-async def get_all_product_api():
-    products = await ProductCore().get_all()
-    return products.model_dump()
+async def get_all_product_api(if_none_match: str | None = Header(default=None)):
+    catalog = await ProductCore.get_catalog()
+    return catalog.response(if_none_match)
@@ -1,6 +1,9 @@
+import os
+
 import pytz
 
 from src.api.APIRouter import APIRouter
+from src.database.connection import engine
 from src.infra.create_time import Time
 
 router = APIRouter(prefix="/api/system", tags=["System"])
@@ -12,3 +15,9 @@ async def get_system_time() -> dict[str, str]:
     moscow_now = Time().now()
     utc_now = moscow_now.astimezone(pytz.UTC)
     return {"utc_time": utc_now.isoformat()}
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats() -> dict:
+    """Live stats of this worker's database connection pool."""
+    return {"pid": os.getpid(), **engine.pool.stats()}
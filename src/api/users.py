@@ -1,55 +1,22 @@
-from fastapi import APIRouter, Header, HTTPException, Request
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from starlette.responses import JSONResponse
 
 from src.business_logic.buy_product import BuyProductBeeline
 from src.business_logic.token import TokenCore
 from src.business_logic.transaction import TransactionCore
-from fastapi.encoders import jsonable_encoder
 
 from src.business_logic.users import UserCore
-from src.repository.product import ProductRepository
-from src.repository.productItems import ProductItemRepository
-from src.repository.unadded_gold import UnAddedProductRepository
+from src.database.connection import unit_of_work
+from src.database.routing import read_session
+from src.infra.responses import model_json, trusted_json
 from src.schemas.purchase import PurchaseHistoryListSchema
 from src.schemas.users import UserSchemaForChange
 
 router = APIRouter(prefix="/api/user", tags=["User"])
 
-
-async def add_item_product(user, items_product) -> UserSchemaForChange:
-    if items_product.skin:
-        user.skin = items_product.skin
-    if items_product.coins:
-        user.coins += items_product.coins
-    if items_product.common_seed:
-        user.common_seed += items_product.common_seed
-    if items_product.epic_seed:
-        user.epic_seed += items_product.epic_seed
-    if items_product.rare_seed:
-        user.rare_seed += items_product.rare_seed
-    if items_product.water:
-        user.water += items_product.water
-    if items_product.level:
-        user.level += items_product.level
-    if items_product.booster:
-        user.booster = items_product.booster
-    if items_product.item:
-        user.item = items_product.item
-    if items_product.pot:
-        user.pot = items_product.pot
-
-    return UserSchemaForChange(
-        coins=user.coins,
-        skin=user.skin,
-        common_seed=user.common_seed,
-        epic_seed=user.epic_seed,
-        rare_seed=user.rare_seed,
-        water=user.water,
-        level=user.level,
-        booster=user.booster,
-        item=user.item,
-        pot=user.pot,
-    )
+PurchaseStatusFilter = Literal["unknown", "in_progress", "success", "error"]
 
 
 async def _require_token(access_token: str | None):
@@ -59,28 +26,18 @@ async def _require_token(access_token: str | None):
     return await TokenCore().is_access_token(access_token)
 
 
-@router.get("")  # конечный URL: /api/user
+@router.get("", dependencies=[Depends(unit_of_work)])  # конечный URL: /api/user
 async def get_user_api(
     request: Request,
     accessToken: str | None = Header(default=None, alias="accessToken"),
 ):
     token = await _require_token(accessToken)
-    user = token.user
-
-    un_added = await UnAddedProductRepository.get_one(user.id)
-    if un_added:
-        product = await ProductRepository().get(un_added.productId)
-        items_product = await ProductItemRepository.get(product.id_product_item)
-
-        user_changed = await add_item_product(user, items_product)
-        await UserCore().change_user(user_changed, user.phone)
 
-        token = await _require_token(accessToken)
-        user = token.user
-        await UnAddedProductRepository().delete_one(un_added.id)
+    # все ожидающие покупки — одной транзакцией
+    user = await UserCore.grant_pending_purchases(token.user.id) or token.user
 
-    user_payload = user.to_read_model_without_orm().model_dump(mode="json")
-    return JSONResponse(content=jsonable_encoder(user_payload), status_code=200)
+    # профиль из ORM уже провалидирован схемой — сериализуем один раз
+    return model_json(user.to_read_model_without_orm())
 
 
 async def _change_user_data(
@@ -95,16 +52,24 @@ async def _change_user_data(
     return JSONResponse(content={"detail": "change success"}, status_code=200)
 
 
-@router.get("/purchases", response_model=PurchaseHistoryListSchema)
+@router.get("/purchases", response_model=PurchaseHistoryListSchema, dependencies=[Depends(read_session)])
 async def get_user_purchases(
+    limit: int = Query(50, ge=1, le=200, description="Сколько покупок вернуть"),
+    before: str | None = Query(
+        None, description="Курсор nextBefore прошлой страницы: '<createdAt>,<id>'"
+    ),
+    status: list[PurchaseStatusFilter] | None = Query(
+        None, description="Оставить только покупки с этими статусами (можно несколько)"
+    ),
     accessToken: str | None = Header(default=None, alias="accessToken"),
 ):
     token = await _require_token(accessToken)
-    purchases = await TransactionCore().get_user_purchases(token.user.id)
-    return purchases
+    purchases = await TransactionCore.get_user_purchases(token.user.id, limit, before, status)
+    # строки уже в форме схемы — отдаём без повторной валидации response_model
+    return trusted_json(purchases)
 
 
-@router.put("")  # конечный URL: /api/user
+@router.put("", dependencies=[Depends(unit_of_work)])  # конечный URL: /api/user
 async def save_user(
     user_to_save: UserSchemaForChange,
     accessToken: str | None = Header(default=None, alias="accessToken"),
@@ -112,7 +77,7 @@ async def save_user(
     return await _change_user_data(user_to_save, accessToken)
 
 
-@router.post("")  # конечный URL: /api/user
+@router.post("", dependencies=[Depends(unit_of_work)])  # конечный URL: /api/user
 async def save_user_post(
     user_to_save: UserSchemaForChange,
     accessToken: str | None = Header(default=None, alias="accessToken"),
@@ -120,6 +85,7 @@ async def save_user_post(
     return await _change_user_data(user_to_save, accessToken)
 
 
+# без unit_of_work: ждём колбэк Билайна и не держим соединение с БД
 @router.post("/buy")  # конечный URL: /api/user/buy
 async def buy_product(
     productId: int,
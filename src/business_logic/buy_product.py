@@ -1,26 +1,35 @@
-import asyncio
-from datetime import timedelta
-
 import httpx
 from fastapi import HTTPException
 from starlette.responses import JSONResponse
 
-from config import SECRET_FOR_BEELINE
+from config import BEELINE_API_URL, BEELINE_TOKEN_TTL, PURCHASE_STATUS_TIMEOUT, SECRET_FOR_BEELINE
 from src.business_logic.transaction import TransactionCore
 from src.infra.encryption import Encryption
+from src.infra.http_client import BeelineHttpClient
 from src.infra.logger import logger
+from src.infra.partner_token_cache import partner_token_cache
 from src.infra.radis import Redis
 from src.infra.create_time import Time
 
+# Ответы партнёра, после которых токен надо перезапросить
+_AUTH_ERROR_STATUSES = (401, 403)
+
+
+def _token_lifetime(response_data: dict) -> float:
+    """Срок жизни токена в секундах из ответа партнёра или дефолт из конфига."""
+    for field in ("expiresIn", "expires_in", "ttl"):
+        value = response_data.get(field)
+        if isinstance(value, (int, float)) and value > 0:
+            return float(value)
+    return BEELINE_TOKEN_TTL
+
 
 class BuyProductBeeline:
-    url = 'https://api.partnerka.beeline.ru'  # взял из рози
+    url = BEELINE_API_URL  # взял из рози
 
     @classmethod
     async def buy_product(cls, phone, productId):
         count = 0
-        token = await BuyProductBeeline.get_token(phone)
-        buy_url = cls.url + f'/v2/game/purchase-async?appID=arkom&token={token}'
         headers = {"accept": "application/json"}
         time = Time().now().isoformat()
         signature = Encryption().hash_str(phone + str(productId) + str(time) + SECRET_FOR_BEELINE)
@@ -33,13 +42,21 @@ class BuyProductBeeline:
         }
         logger.info(f'data = {data}')
 
-        try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-                response = await client.post(buy_url, json=data, headers=headers)
-                logger.info(f'Запрос на покупку отправлен количество раз {count}')
-        except httpx.RequestError as exc:
-            raise HTTPException(status_code=502, detail=f"Error occurred while requesting {exc.request.url!r}.")
+        token = await partner_token_cache.get(phone)
+        token_from_cache = token is not None
+        if not token_from_cache:
+            token = await BuyProductBeeline.get_token(phone)
+
+        response = await cls._send_purchase(token, data, headers)
+        if token_from_cache and response.status_code in _AUTH_ERROR_STATUSES:
+            # кэшированный токен отозван/истёк раньше срока — берём новый и повторяем один раз
+            logger.info(f'билайн отклонил токен ({response.status_code}), запрашиваю новый')
+            await partner_token_cache.invalidate(phone)
+            token = await BuyProductBeeline.get_token(phone)
+            response = await cls._send_purchase(token, data, headers)
+        logger.info(f'Запрос на покупку отправлен количество раз {count}')
         count += 1
+        purchaseId = None
         if response.status_code == 200:
             logger.info(f'Запрос билайну покупку прошел успешно')
             response_data = response.json()
@@ -49,26 +66,32 @@ class BuyProductBeeline:
             logger.error(f'Запрос билайну покупку прошел не успешно')
             logger.error(f'ошибка = {response.text}')
 
-        await asyncio.sleep(3)
+        if not purchaseId:
+            logger.info(f'возвращаю 403')
+            raise HTTPException(status_code=403, detail="not enough funds to buy")
 
-        attempts = 0
-        while attempts < 5:
-            logger.info(f'{attempts} попытка взять данные из Redis')
-            status = Redis.get_status_purchase(phone)
-            if status == 'success':
-                logger.info(f'возвращаю 200')
-                return JSONResponse(status_code=200, content='transaction processed success')
-            if status == 'error':
-                logger.info(f'возвращаю 402')
-                raise HTTPException(status_code=402, detail="not enough funds to buy")
-            if status == 'in_progress':
-                logger.info(f'возвращаю 403')
-                raise HTTPException(status_code=403, detail="in_progress")
-            attempts += 1
-            await asyncio.sleep(3)
+        # ждём колбэк /api/game/pay-product, а не опрашиваем Redis по таймеру
+        status = await Redis.wait_status_purchase(purchaseId, PURCHASE_STATUS_TIMEOUT)
+        if status == 'success':
+            logger.info(f'возвращаю 200')
+            return JSONResponse(status_code=200, content='transaction processed success')
+        if status == 'error':
+            logger.info(f'возвращаю 402')
+            raise HTTPException(status_code=402, detail="not enough funds to buy")
+        if status == 'in_progress':
+            logger.info(f'возвращаю 403')
+            raise HTTPException(status_code=403, detail="in_progress")
         logger.info(f'возвращаю 403')
         raise HTTPException(status_code=403, detail="not enough funds to buy")
 
+    @classmethod
+    async def _send_purchase(cls, token, data, headers):
+        buy_url = cls.url + f'/v2/game/purchase-async?appID=arkom&token={token}'
+        try:
+            return await BeelineHttpClient.get().post(buy_url, json=data, headers=headers)
+        except httpx.RequestError as exc:
+            raise HTTPException(status_code=502, detail=f"Error occurred while requesting {exc.request.url!r}.")
+
     @classmethod
     async def get_token(cls, phone):
         get_token_url = cls.url + f'/v2/game/token'
@@ -83,8 +106,7 @@ class BuyProductBeeline:
         }
         logger.info(f"time = {time}, signature_data = arkom {phone}{time}{SECRET_FOR_BEELINE}, signature = {signature}")
         try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-                response = await client.post(get_token_url, json=data, headers=headers)
+            response = await BeelineHttpClient.get().post(get_token_url, json=data, headers=headers)
         except httpx.RequestError as exc:
             raise HTTPException(status_code=502, detail=f"Error occurred while requesting {exc.request.url!r}.")
 
@@ -92,6 +114,8 @@ class BuyProductBeeline:
             response_data = response.json()
             token = response_data.get("token")
             logger.info(f'Запрос билайну на получение токена прошел успешно')
+            if token:
+                await partner_token_cache.set(phone, token, _token_lifetime(response_data))
         else:
             logger.info(f'ошибка = {response.text}')
             token = None
@@ -0,0 +1,184 @@
+"""Очередь колбэков оплаты Билайна на Redis Stream (``PAYMENT_CALLBACK_MODE=queue``).
+
+Эндпоинт колбэка ``POST /api/game/pay-product`` (src/api/beeline.py)
+валидирует колбэк, кладёт его в stream и сразу отвечает 200.
+Consumer в каждом воркере читает stream в общей consumer group пачками и
+применяет колбэки через ``TransactionCore.process_callback`` (идемпотентно).
+
+* Backpressure: при бэклоге больше ``PAYMENT_QUEUE_MAX_BACKLOG`` колбэк
+  отклоняется 503 — Билайн повторит его позже.
+* Retry: неподтверждённое (упавшее) сообщение остаётся в PEL и через
+  ``PAYMENT_QUEUE_RETRY_IDLE_MS`` забирается повторно (XAUTOCLAIM) — в том
+  числе у упавшего воркера.
+* Dead letter: после ``PAYMENT_QUEUE_MAX_DELIVERIES`` попыток сообщение
+  переносится в ``payments:callbacks:dead`` для ручного разбора.
+"""
+
+import asyncio
+import os
+import socket
+
+from redis.exceptions import RedisError, ResponseError
+
+from config import (
+    PAYMENT_QUEUE_BATCH,
+    PAYMENT_QUEUE_BLOCK_MS,
+    PAYMENT_QUEUE_MAX_BACKLOG,
+    PAYMENT_QUEUE_MAX_DELIVERIES,
+    PAYMENT_QUEUE_RETRY_IDLE_MS,
+)
+from src.business_logic.transaction import TransactionCore
+from src.infra.logger import logger
+from src.infra.radis import redis_client
+from src.schemas.purchase import PurchaseStatus
+
+STREAM = "payments:callbacks"
+DEAD_LETTER_STREAM = "payments:callbacks:dead"
+GROUP = "payments"
+
+# Пауза после сбоя consumer: растёт вдвое до потолка, сбрасывается после успешного цикла
+_BACKOFF_MIN = 1.0
+_BACKOFF_MAX = 30.0
+
+
+class PaymentCallbackQueue:
+
+    def __init__(self) -> None:
+        self._consumer_name = f"{socket.gethostname()}-{os.getpid()}"
+        self._task: asyncio.Task | None = None
+
+    # ------------------------------------------------------------------ #
+    # Приём колбэка
+    # ------------------------------------------------------------------ #
+
+    async def enqueue(self, callback: PurchaseStatus) -> bool:
+        """``False`` — очередь переполнена, колбэк надо отклонить."""
+        # подтверждённые сообщения consumer удаляет, так что XLEN — это бэклог
+        if await redis_client.xlen(STREAM) >= PAYMENT_QUEUE_MAX_BACKLOG:
+            logger.warning(f"[PAYMENT_QUEUE] Очередь переполнена, отклоняем {callback.id}")
+            return False
+        await redis_client.xadd(STREAM, {"payload": callback.model_dump_json()})
+        return True
+
+    # ------------------------------------------------------------------ #
+    # Consumer
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._consume())
+            self._task.add_done_callback(self._on_consumer_done)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @staticmethod
+    def _on_consumer_done(task: asyncio.Task) -> None:
+        # _consume сам не выходит: сюда попадаем только при stop() или из-за бага
+        if task.cancelled():
+            return
+        exc = task.exception()
+        logger.critical(
+            f"[PAYMENT_QUEUE] Consumer остановился, колбэки копятся в {STREAM}: {exc!r}",
+            exc_info=exc,
+        )
+
+    async def _consume(self) -> None:
+        backoff = _BACKOFF_MIN
+        while True:
+            try:
+                await self._ensure_group()
+                # сначала зависшие/упавшие сообщения, потом новые
+                entries = await self._reclaim()
+                if not entries:
+                    response = await redis_client.xreadgroup(
+                        GROUP,
+                        self._consumer_name,
+                        {STREAM: ">"},
+                        count=PAYMENT_QUEUE_BATCH,
+                        block=PAYMENT_QUEUE_BLOCK_MS,
+                    )
+                    entries = response[0][1] if response else []
+                if entries:
+                    await self._process_batch(entries)
+                backoff = _BACKOFF_MIN
+                continue
+            except RedisError as exc:
+                logger.warning(f"[PAYMENT_QUEUE] Ошибка Redis, повтор через {backoff:.0f} с: {exc}")
+            except Exception:
+                # неожиданный сбой не должен молча убить consumer: пишем и живём дальше
+                logger.exception(f"[PAYMENT_QUEUE] Сбой consumer, повтор через {backoff:.0f} с")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _BACKOFF_MAX)
+
+    @staticmethod
+    async def _ensure_group() -> None:
+        try:
+            await redis_client.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+        except ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    async def _reclaim(self) -> list:
+        """Забрать сообщения, которые слишком долго висят без подтверждения."""
+        response = await redis_client.xautoclaim(
+            STREAM,
+            GROUP,
+            self._consumer_name,
+            min_idle_time=PAYMENT_QUEUE_RETRY_IDLE_MS,
+            start_id="0-0",
+            count=PAYMENT_QUEUE_BATCH,
+        )
+        entries = [(entry_id, fields) for entry_id, fields in response[1] if fields]
+        if not entries:
+            return []
+
+        retry = []
+        for entry_id, fields in entries:
+            pending = await redis_client.xpending_range(
+                STREAM, GROUP, min=entry_id, max=entry_id, count=1
+            )
+            deliveries = pending[0]["times_delivered"] if pending else 0
+            if deliveries > PAYMENT_QUEUE_MAX_DELIVERIES:
+                await self._dead_letter(entry_id, fields, deliveries)
+            else:
+                retry.append((entry_id, fields))
+        return retry
+
+    async def _process_batch(self, entries: list) -> None:
+        done = []
+        for entry_id, fields in entries:
+            try:
+                callback = PurchaseStatus.model_validate_json(fields["payload"])
+                # каждый колбэк — своя короткая транзакция: «ядовитое» сообщение
+                # не откатывает соседей по пачке
+                await TransactionCore.process_callback(callback.id, callback.status)
+                done.append(entry_id)
+            except Exception as exc:
+                # не подтверждаем — вернётся через XAUTOCLAIM
+                logger.error(f"[PAYMENT_QUEUE] Не удалось применить {entry_id}: {exc}")
+
+        if done:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.xack(STREAM, GROUP, *done)
+                pipe.xdel(STREAM, *done)
+                await pipe.execute()
+
+    @staticmethod
+    async def _dead_letter(entry_id: str, fields: dict, deliveries: int) -> None:
+        logger.error(f"[PAYMENT_QUEUE] {entry_id} → dead letter после {deliveries} попыток")
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.xadd(DEAD_LETTER_STREAM, {**fields, "source_id": entry_id, "deliveries": deliveries})
+            pipe.xack(STREAM, GROUP, entry_id)
+            pipe.xdel(STREAM, entry_id)
+            await pipe.execute()
+
+
+payment_callback_queue = PaymentCallbackQueue()
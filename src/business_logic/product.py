@@ -1,5 +1,12 @@
+import asyncio
+
 from fastapi import HTTPException
+from redis.exceptions import RedisError
 
+from config import CATALOG_CACHE_TTL
+from src.infra.logger import logger
+from src.infra.radis import redis_client
+from src.infra.snapshot import Snapshot, dump_json
 from src.repository.product import ProductRepository
 from src.schemas.product import ProductSchema, ProductsListSchema
 
@@ -18,3 +25,61 @@ class ProductCore:
         if product is None:
             raise HTTPException(status_code=404, detail="product not found")
         return product
+
+    @staticmethod
+    async def get_catalog() -> Snapshot:
+        return await ProductCatalogCache.get()
+
+
+class ProductCatalogCache:
+    """Каталог в памяти воркера в виде готовых JSON-байтов.
+
+    Версия каталога лежит в Redis (``catalog:version``): ``invalidate()``
+    увеличивает её, и все воркеры пересобирают снапшот на следующем запросе.
+
+    В приложении нет эндпоинтов, которые меняют ``products``/``products_item``:
+    каталог правят вне приложения (SQL, миграции, ``bulk_seed``). После такой
+    правки каталог может отдаваться устаревшим до ``CATALOG_CACHE_TTL`` секунд —
+    это осознанный компромисс. Чтобы применить правку сразу, достаточно
+    ``redis-cli INCR catalog:version``. Если появится запись каталога в коде,
+    она должна вызывать ``invalidate()`` после коммита.
+    """
+
+    VERSION_KEY = "catalog:version"
+
+    _snapshot: Snapshot | None = None
+    _lock = asyncio.Lock()
+
+    @classmethod
+    async def get(cls) -> Snapshot:
+        version = await cls._current_version()
+        snapshot = cls._snapshot
+        if snapshot is not None and snapshot.is_fresh(version):
+            return snapshot
+
+        # одна пересборка на воркер, остальные ждут её результат
+        async with cls._lock:
+            snapshot = cls._snapshot
+            if snapshot is not None and snapshot.is_fresh(version):
+                return snapshot
+            catalog = await ProductCore.get_all()
+            snapshot = Snapshot(dump_json(catalog.model_dump()), version, CATALOG_CACHE_TTL)
+            cls._snapshot = snapshot
+            logger.info(f"[CATALOG] rebuilt version={version} etag={snapshot.etag}")
+            return snapshot
+
+    @classmethod
+    async def invalidate(cls) -> None:
+        cls._snapshot = None
+        try:
+            await redis_client.incr(cls.VERSION_KEY)
+        except RedisError as exc:
+            logger.warning(f"[CATALOG] Не удалось увеличить версию каталога: {exc}")
+
+    @classmethod
+    async def _current_version(cls) -> str | None:
+        try:
+            return await redis_client.get(cls.VERSION_KEY)
+        except RedisError as exc:
+            logger.warning(f"[CATALOG] Redis недоступен, живём по TTL: {exc}")
+            return cls._snapshot.version if cls._snapshot is not None else None
@@ -1,10 +1,15 @@
+from datetime import datetime
+from functools import partial
+
 from fastapi import HTTPException, status
 
 from config import SALT_BUBBLES
+from src.database.connection import after_commit
 from src.database.models import TokenModel
 from src.infra.encryption import Encryption
 from src.infra.logger import logger
 from src.infra.create_time import Time
+from src.infra.token_cache import token_cache
 from src.repository.tokens import TokenRepository
 
 
@@ -40,22 +45,50 @@ class TokenCore:
         token_record.expires_at = Time.now_plus_hour_for_refresh_token()
 
         await TokenRepository().add(token_record)
+        await after_commit(partial(token_cache.invalidate, old_token))
         logger.info(f"Refresh token updated for user_id={user_id}")
         return new_token
 
+    @staticmethod
+    async def login(phone: str) -> tuple[str, datetime]:
+        """
+        Логин одной транзакцией: get-or-create пользователя + новый токен.
+        Возвращает (token, expires_at).
+        """
+        new_token = Encryption().hash_str(phone, SALT_BUBBLES, str(Time().now()))
+        row = await TokenRepository().upsert_for_phone(
+            phone,
+            new_token,
+            Time.now_plus_hour_for_refresh_token(),
+        )
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to issue token",
+            )
+
+        user_id, token, expires_at = row
+        await after_commit(partial(token_cache.invalidate_user, user_id))
+        logger.info(f"Token issued for user_id={user_id}")
+        return token, expires_at
+
     @staticmethod
     async def is_access_token(access_token: str) -> TokenModel:
         """
         Проверяет валидность access_token:
         * возвращает TokenModel, если всё ок
         * бросает HTTPException 401, если токен не найден или истёк
+        Провалидированные токены берутся из in-process кэша.
         """
-        token_record = await TokenRepository().get(access_token)
+        token_record = token_cache.get(access_token)
         if token_record is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid access token",
-            )
+            token_record = await TokenRepository().get(access_token)
+            if token_record is None:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid access token",
+                )
+            token_cache.set(token_record)
 
         # мастер-токен для локалки
         if access_token == "393e0c78db209ceb2cd24690fa5d8542a6da6f96":
@@ -63,6 +96,7 @@ class TokenCore:
             return token_record
 
         if Time().now() > token_record.expires_at:
+            token_cache.evict(access_token)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Access token expired",
@@ -98,4 +132,5 @@ class TokenCore:
     async def create_and_store_token(user_id: int, login: str) -> str:
         token = Encryption().hash_str(login, SALT_BUBBLES, str(Time().now()))
         await TokenCore.add_token(user_id, token)
+        await after_commit(partial(token_cache.invalidate_user, user_id))
         return token
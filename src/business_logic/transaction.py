@@ -1,13 +1,31 @@
+from datetime import datetime, timezone
+
 from fastapi import HTTPException
 
 from src.database.models import TransactionModel
+from src.database.routing import ReadRouting
+from src.infra.logger import logger
+from src.infra.radis import Redis
 from src.repository.transaction import TransactionRepository
 from src.repository.users import UserRepository
-from src.schemas.purchase import (
-    PurchaseHistoryItemSchema,
-    PurchaseHistoryListSchema,
-    PurchaseProductSchema,
-)
+
+
+def _iso(value: datetime) -> str:
+    """Как pydantic: UTC с суффиксом ``Z``."""
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _parse_purchase_cursor(before: str) -> tuple[datetime, int]:
+    """``<createdAt>,<id>`` из ``nextBefore`` прошлой страницы."""
+    try:
+        created_at, purchase_id = before.rsplit(",", 1)
+        # «+» смещения в неэкранированном query string приходит пробелом
+        parsed = datetime.fromisoformat(created_at.strip().replace(" ", "+"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed, int(purchase_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="before must be '<createdAt>,<id>'")
 
 
 class TransactionCore:
@@ -24,6 +42,7 @@ class TransactionCore:
         )
 
         await TransactionRepository().add(transaction_model)
+        await ReadRouting.mark_write(user.id)
 
     @staticmethod
     async def change_status(
@@ -31,7 +50,40 @@ class TransactionCore:
             status: str
     ):
         transaction.status = status
+        user_id = transaction.id_user
         await TransactionRepository().add(transaction)
+        await ReadRouting.mark_write(user_id)
+
+    @staticmethod
+    async def apply_callback_status(purchaseId: str, status: str) -> int | None:
+        """Применить статус колбэка; ``user_id``, если применён этим вызовом.
+
+        ``None`` — дубль/повтор колбэка (статус уже был применён). 404, если
+        такой транзакции нет вовсе.
+        """
+        known, user_id = await TransactionRepository.apply_callback_status(purchaseId, status)
+        if not known:
+            raise HTTPException(status_code=404, detail="transaction not found")
+        if user_id is not None:
+            await ReadRouting.mark_write(user_id)
+        return user_id
+
+    @staticmethod
+    async def process_callback(purchaseId: str, status: str) -> None:
+        """Колбэк Билайна: применить статус и разбудить ожидающий /buy."""
+        user_id = await TransactionCore.apply_callback_status(purchaseId, status)
+        if user_id is None:
+            logger.info("Транзакция уже была получена ранее")
+            return
+
+        if status == "success":
+            logger.info(f"Покупка {purchaseId} выдана пользователю {user_id}")
+        elif status == "error":
+            logger.error("Ответ билайна пришёл с ошибкой")
+        elif status == "in_progress":
+            logger.info("Ответ билайна пришёл статус «в процессе»")
+        # статус уже закоммичен — buy_product увидит начисление
+        await Redis.add_status_purchase(purchaseId, status)
 
     @staticmethod
     async def get_transaction(
@@ -56,28 +108,36 @@ class TransactionCore:
         return transaction_model
 
     @staticmethod
-    async def get_user_purchases(user_id: int) -> PurchaseHistoryListSchema:
-        transactions = await TransactionRepository().list_by_user(user_id)
-        purchase_items: list[PurchaseHistoryItemSchema] = []
-
-        for transaction, product in transactions:
-            product_schema = (
-                PurchaseProductSchema.model_validate(product)
-                if product is not None
-                else PurchaseProductSchema(
-                    id=transaction.productId,
-                    name="Unknown product",
-                    price=None,
-                )
-            )
-
-            purchase_items.append(
-                PurchaseHistoryItemSchema(
-                    id=transaction.id,
-                    status=transaction.status,
-                    product=product_schema,
-                    created_at=transaction.created_at,
-                )
-            )
-
-        return PurchaseHistoryListSchema(purchases=purchase_items)
+    async def get_user_purchases(
+            user_id: int,
+            limit: int,
+            before: str | None = None,
+            statuses: list[str] | None = None,
+    ) -> dict:
+        """Страница истории покупок в форме ``PurchaseHistoryListSchema``.
+
+        Строки репозитория — доверенные данные из БД, поэтому собираются в dict
+        напрямую, без pydantic-валидации каждой строки.
+        """
+        cursor = _parse_purchase_cursor(before) if before else None
+        # +1 строка — признак, что есть следующая страница
+        rows = await TransactionRepository.list_by_user(user_id, limit + 1, cursor, statuses)
+        page = rows[:limit]
+        purchases = [
+            {
+                "id": row["id"],
+                "product": {
+                    "id": row["product_id"],
+                    "name": row["product_name"] if row["product_name"] is not None else "Unknown product",
+                    "price": row["product_price"],
+                },
+                "status": row["status"],
+                "createdAt": _iso(row["created_at"]),
+            }
+            for row in page
+        ]
+        next_before = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_before = f"{_iso(last['created_at'])},{last['id']}"
+        return {"purchases": purchases, "nextBefore": next_before}
@@ -1,7 +1,11 @@
+from functools import partial
 from typing import Optional
 
+from src.database.connection import after_commit
 from src.database.models import UserModel
 from src.infra.logger import logger
+from src.infra.token_cache import token_cache
+from src.repository.unadded_gold import UnAddedProductRepository
 from src.repository.users import UserRepository
 from src.schemas.tokens import TokenSchema
 from src.schemas.users import UserSchema, UserSchemaForChange
@@ -52,4 +56,19 @@ class UserCore:
         user_from_db.item = user.item
         user_from_db.pot = user.pot
         user_from_db.last_update = Time.now()
+        user_id = user_from_db.id
         await UserRepository().add(user_from_db)
+        # профиль лежит в кэше токенов вместе с user — сбрасываем, но только
+        # после commit: иначе параллельный запрос закэширует старую строку
+        await after_commit(partial(token_cache.invalidate_user, user_id))
+
+    @staticmethod
+    async def grant_pending_purchases(user_id: int) -> Optional[UserModel]:
+        """Начисляет все оплаченные, но ещё не выданные покупки.
+
+        Возвращает свежего пользователя или ``None``, если начислять было нечего.
+        """
+        user = await UnAddedProductRepository.grant_all(user_id)
+        if user is not None:
+            await after_commit(partial(token_cache.invalidate_user, user_id))
+        return user
@@ -0,0 +1,52 @@
+"""Массовая запись через COPY (asyncpg ``copy_records_to_table``).
+
+COPY идёт в соединении переданной сессии, т.е. в её текущей транзакции, и
+не упирается в лимит параметров одного INSERT. Python-side ``default=...``
+моделей COPY не применяет (только server_default) — такие колонки надо
+передавать явно (см. ``python_defaults``). JSON/JSONB — строкой (см. ``json_value``).
+"""
+
+import json
+from typing import Any, AsyncIterable, Iterable, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def python_defaults(model: Any, exclude: Iterable[str] = ()) -> dict[str, Any]:
+    """Скалярные ``default=...`` колонок модели, которые COPY сам не подставит."""
+    table: Table = getattr(model, "__table__", model)
+    skip = set(exclude)
+    return {
+        column.name: column.default.arg
+        for column in table.columns
+        if column.name not in skip
+        and column.default is not None
+        and column.default.is_scalar
+        and not column.primary_key
+    }
+
+
+def json_value(value: Any) -> str:
+    """Значение для JSON-колонки в COPY (кодек asyncpg ждёт строку)."""
+    return json.dumps(value, ensure_ascii=False)
+
+
+async def copy_records(
+    session: AsyncSession,
+    model: Any,
+    columns: Sequence[str],
+    records: Iterable[tuple] | AsyncIterable[tuple],
+) -> int:
+    """COPY ``records`` в таблицу модели; возвращает число записанных строк."""
+    table: Table = getattr(model, "__table__", model)
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    status = await raw.driver_connection.copy_records_to_table(
+        table.name,
+        records=records,
+        columns=list(columns),
+        schema_name=table.schema,
+    )
+    # asyncpg возвращает статус команды: "COPY <n>"
+    return int(status.split()[-1])
@@ -0,0 +1,267 @@
+"""Массовое наполнение БД для нагрузочных тестов (через COPY).
+
+Примеры::
+
+    python -m src.database.bulk_seed --users 100000
+    python -m src.database.bulk_seed --users 50000 --phone-prefix 7988 --event-id 3
+    python -m src.database.bulk_seed --products 20
+    python -m src.database.bulk_seed --users 20000 --phone-prefix 7977 --purchases 25
+    python -m src.database.bulk_seed --users 5000 --phone-prefix 7966 --archives 10000
+
+Пользователи получают телефоны ``<prefix><номер>``, у каждого — токен. Для
+``--event-id`` всем новым пользователям пишутся случайные результаты ивента,
+для ``--purchases`` — история покупок (и часть ожидающих начисления), для
+``--archives`` — завершённые ивенты с архивом и непретензованными призами
+призёров (как после ``archive_event``).
+По каждой таблице печатается скорость в строках в секунду.
+"""
+
+import argparse
+import asyncio
+import random
+import secrets
+import time
+from datetime import timedelta
+
+from sqlalchemy import insert, select
+
+from src.business_logic.product import ProductCatalogCache
+from src.database.bulk import copy_records, json_value, python_defaults
+from src.database.connection import async_session_maker, engine
+from src.database.models import (
+    ProductItemModel,
+    ProductModel,
+    TokenModel,
+    TransactionModel,
+    UnaddedProduct,
+    UserModel,
+)
+from src.events.leaderboard import RedisLeaderboard
+from src.events.models import EventHistoryModel, EventModel, EventRatingModel
+from src.infra.create_time import Time
+from src.infra.radis import close_redis
+from src.prizes.models import UnclaimedRewardModel
+
+# Призовых мест в каждом архиве --archives
+_ARCHIVE_WINNERS = 10
+
+
+def _report(table: str, rows: int, started: float) -> None:
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"{table:<18} {rows:>10} rows  {elapsed:8.2f}s  {rows / elapsed:>12,.0f} rows/s")
+
+
+async def seed_users(count: int, phone_prefix: str) -> list[int]:
+    """Пользователи + токены; возвращает id созданных пользователей."""
+    width = 11 - len(phone_prefix)
+    # skin и прочие Python-side default модели COPY сам не подставит
+    defaults = python_defaults(UserModel, exclude=("phone",))
+    default_values = tuple(defaults.values())
+    async with async_session_maker() as session:
+        started = time.perf_counter()
+        written = await copy_records(
+            session,
+            UserModel,
+            ("phone", *defaults),
+            ((f"{phone_prefix}{n:0{width}d}", *default_values) for n in range(count)),
+        )
+        _report("users", written, started)
+
+        user_ids = list(
+            (
+                await session.execute(
+                    select(UserModel.id)
+                    .where(UserModel.phone.startswith(phone_prefix))
+                    .order_by(UserModel.id.desc())
+                    .limit(count)
+                )
+            ).scalars()
+        )
+
+        started = time.perf_counter()
+        expires_at = Time.now_plus_hour_for_refresh_token()
+        written = await copy_records(
+            session,
+            TokenModel,
+            ("id_user", "token", "expires_at"),
+            ((user_id, secrets.token_hex(20), expires_at) for user_id in user_ids),
+        )
+        _report("tokens", written, started)
+
+        await session.commit()
+    return user_ids
+
+
+async def seed_ratings(event_id: int, user_ids: list[int]) -> None:
+    async with async_session_maker() as session:
+        started = time.perf_counter()
+        written = await copy_records(
+            session,
+            EventRatingModel,
+            ("event_id", "user_id", "result"),
+            ((event_id, user_id, round(random.uniform(0, 10_000), 2)) for user_id in user_ids),
+        )
+        await session.commit()
+        _report("event_ratings", written, started)
+    # лидерборд прогреется из БД при первом чтении
+    await RedisLeaderboard.drop(event_id)
+
+
+async def seed_purchases(user_ids: list[int], per_user: int) -> None:
+    """История покупок за последний год; ~5% — ещё не начисленные."""
+    async with async_session_maker() as session:
+        product_ids = list(await session.scalars(select(ProductModel.id)))
+        if not product_ids:
+            raise SystemExit("нет продуктов: сначала --products")
+
+        now = Time.now()
+        purchases = [
+            (user_id, random.choice(product_ids), now - timedelta(seconds=random.randint(0, 365 * 24 * 3600)))
+            for user_id in user_ids
+            for _ in range(per_user)
+        ]
+
+        started = time.perf_counter()
+        written = await copy_records(
+            session,
+            TransactionModel,
+            ("id_user", "productId", "purchaseId", "status", "created_at"),
+            (
+                (user_id, product_id, f"seed-{secrets.token_hex(12)}",
+                 random.choice(("success", "success", "success", "error")), created_at)
+                for user_id, product_id, created_at in purchases
+            ),
+        )
+        _report("transactions", written, started)
+
+        started = time.perf_counter()
+        written = await copy_records(
+            session,
+            UnaddedProduct,
+            ("id_user", "productId"),
+            ((user_id, product_id) for user_id, product_id, _ in purchases if random.random() < 0.05),
+        )
+        _report("unadded_product", written, started)
+        await session.commit()
+
+
+async def seed_archives(user_ids: list[int], count: int) -> None:
+    """Завершённые ивенты: строка event_history и призы победителей на каждый."""
+    if len(user_ids) < _ARCHIVE_WINNERS:
+        raise SystemExit(f"для --archives нужно не меньше {_ARCHIVE_WINNERS} пользователей")
+    async with async_session_maker() as session:
+        now = Time.now()
+        started = time.perf_counter()
+        # id ивентов нужны для FK истории и призов — здесь executemany с RETURNING
+        event_ids = list(
+            await session.scalars(
+                insert(EventModel).returning(EventModel.id),
+                [
+                    {
+                        "name": f"Load test archive #{n}",
+                        "event_type": "score",
+                        "logo": "",
+                        "start_date": now - timedelta(days=n + 1),
+                        "end_date": now - timedelta(days=n),
+                        "level_ids": [],
+                    }
+                    for n in range(count)
+                ],
+            )
+        )
+        _report("events", len(event_ids), started)
+
+        winners = {
+            event_id: [
+                {
+                    "user_id": user_id,
+                    "result": float(10_000 - place),
+                    "place": place,
+                    "rewards": {"coins": 1000 // place},
+                }
+                for place, user_id in enumerate(random.sample(user_ids, _ARCHIVE_WINNERS), start=1)
+            ]
+            for event_id in event_ids
+        }
+
+        started = time.perf_counter()
+        written = await copy_records(
+            session,
+            EventHistoryModel,
+            ("event_id", "ended_at", "results"),
+            (
+                (event_id, now - timedelta(days=n), json_value(rows))
+                for n, (event_id, rows) in enumerate(winners.items())
+            ),
+        )
+        _report("event_history", written, started)
+
+        started = time.perf_counter()
+        written = await copy_records(
+            session,
+            UnclaimedRewardModel,
+            ("user_id", "event_id", "place", "rewards", "created_at"),
+            (
+                (row["user_id"], event_id, row["place"], json_value(row["rewards"]), now)
+                for event_id, rows in winners.items()
+                for row in rows
+            ),
+        )
+        _report("unclaimed_rewards", written, started)
+        await session.commit()
+
+
+async def seed_products(count: int) -> None:
+    async with async_session_maker() as session:
+        started = time.perf_counter()
+        # id предметов нужны для FK продуктов — здесь executemany с RETURNING
+        item_ids = list(
+            await session.scalars(
+                insert(ProductItemModel).returning(ProductItemModel.id),
+                [{"coins": random.randint(10, 10_000)} for _ in range(count)],
+            )
+        )
+        _report("products_item", len(item_ids), started)
+
+        started = time.perf_counter()
+        written = await copy_records(
+            session,
+            ProductModel,
+            ("name", "price", "id_product_item"),
+            ((f"Load test pack #{item_id}", random.randint(1, 500), item_id) for item_id in item_ids),
+        )
+        await session.commit()
+        _report("products", written, started)
+    await ProductCatalogCache.invalidate()
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        if args.products:
+            await seed_products(args.products)
+        if args.users:
+            user_ids = await seed_users(args.users, args.phone_prefix)
+            if args.event_id is not None:
+                await seed_ratings(args.event_id, user_ids)
+            if args.purchases:
+                await seed_purchases(user_ids, args.purchases)
+            if args.archives:
+                await seed_archives(user_ids, args.archives)
+    finally:
+        await engine.dispose()
+        await close_redis()
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk-seed the database via COPY.")
+    parser.add_argument("--users", type=int, default=0, help="сколько пользователей (с токенами) создать")
+    parser.add_argument("--phone-prefix", default="7999", help="префикс телефонов; должен быть новым для каждого прогона")
+    parser.add_argument("--event-id", type=int, help="записать новым пользователям результаты этого ивента")
+    parser.add_argument("--products", type=int, default=0, help="сколько продуктов (с предметами) создать")
+    parser.add_argument("--purchases", type=int, default=0, help="сколько покупок записать каждому новому пользователю")
+    parser.add_argument("--archives", type=int, default=0, help="сколько завершённых ивентов с архивом и призами создать")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(_parse_args()))
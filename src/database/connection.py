@@ -1,13 +1,40 @@
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator, Annotated
+from contextvars import ContextVar
+from typing import AsyncGenerator, Annotated, Awaitable, Callable
 
 from sqlalchemy import MetaData, String
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
-from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from config import (
+    DB_COMMAND_TIMEOUT,
+    DB_HOST,
+    DB_MAX_OVERFLOW,
+    DB_NAME,
+    DB_PASS,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PORT,
+    DB_REPLICA_HOST,
+    DB_REPLICA_NAME,
+    DB_REPLICA_PASS,
+    DB_REPLICA_PORT,
+    DB_REPLICA_USER,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_STATEMENT_TIMEOUT_MS,
+    DB_USER,
+)
+from src.database.pool import MeteredPool
+from src.infra.logger import logger
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+REPLICA_DATABASE_URL = (
+    f"postgresql+asyncpg://{DB_REPLICA_USER}:{DB_REPLICA_PASS}@{DB_REPLICA_HOST}:{DB_REPLICA_PORT}/{DB_REPLICA_NAME}"
+    if DB_REPLICA_HOST
+    else None
+)
 
 
 class Base(DeclarativeBase):
@@ -31,11 +58,152 @@ class Base(DeclarativeBase):
 
 metadata = MetaData()
 
-engine = create_async_engine(DATABASE_URL)
+_ENGINE_OPTIONS = dict(
+    poolclass=MeteredPool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "command_timeout": DB_COMMAND_TIMEOUT,
+        "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)},
+    },
+)
+
+engine = create_async_engine(DATABASE_URL, **_ENGINE_OPTIONS)
 async_session_maker = async_sessionmaker(engine)
 
+# Необязательная реплика только для чтения. read_only на уровне сессии Postgres
+# ловит случайную запись и тогда, когда «реплика» — просто второй локальный инстанс.
+replica_engine: AsyncEngine | None = (
+    create_async_engine(
+        REPLICA_DATABASE_URL,
+        **{
+            **_ENGINE_OPTIONS,
+            "connect_args": {
+                **_ENGINE_OPTIONS["connect_args"],
+                "server_settings": {
+                    "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS),
+                    "default_transaction_read_only": "on",
+                },
+            },
+        },
+    )
+    if REPLICA_DATABASE_URL
+    else None
+)
+replica_session_maker = async_sessionmaker(replica_engine) if replica_engine is not None else async_session_maker
+
+
+# Сессия unit-of-work текущего запроса (если эндпоинт её открыл)
+_request_session: ContextVar[AsyncSession | None] = ContextVar("request_session", default=None)
+# Побочные эффекты (Redis и т.п.), отложенные до фиксации транзакции запроса
+_after_commit: ContextVar[list[Callable[[], Awaitable[None]]] | None] = ContextVar(
+    "after_commit", default=None
+)
+
+
+def in_request_scope() -> bool:
+    """Открыт ли unit-of-work запроса.
+
+    Внутри него ``session.rollback()`` репозитория откатывает транзакцию всего
+    запроса, поэтому проглатывать ``SQLAlchemyError`` нельзя — репозитории
+    пробрасывают ошибку, и запрос завершается ошибкой, а не «успехом» без записи.
+    """
+    return _request_session.get() is not None
+
+
+async def after_commit(callback: Callable[[], Awaitable[None]]) -> None:
+    """Выполнить ``callback`` после фиксации транзакции запроса.
+
+    Внутри unit-of-work ``commit()`` репозитория — только flush, поэтому
+    запись в Redis сразу после него может пережить откат. Такие эффекты
+    регистрируются здесь и выполняются ``request_scope`` после настоящего
+    commit (до отправки ответа); при откате — отбрасываются. Вне unit-of-work
+    commit настоящий, и ``callback`` выполняется сразу.
+    """
+    callbacks = _after_commit.get()
+    if callbacks is None:
+        await callback()
+    else:
+        callbacks.append(callback)
+
 
 @asynccontextmanager
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Сессия запроса, если открыт unit-of-work, иначе — короткая отдельная сессия."""
+    session = _request_session.get()
+    if session is not None:
+        yield session
+        return
+
     async with async_session_maker() as session:
         yield session
+
+
+@asynccontextmanager
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Как ``get_async_session()``, но вне запроса читает с реплики (если она есть).
+
+    Для данных, общих для всех пользователей (каталог и т.п.), где отставание
+    реплики на доли секунды допустимо.
+    """
+    session = _request_session.get()
+    if session is not None:
+        yield session
+        return
+
+    async with replica_session_maker() as session:
+        yield session
+
+
+@asynccontextmanager
+async def request_scope(bind: AsyncEngine) -> AsyncGenerator[AsyncSession, None]:
+    """Одно соединение с ``bind`` и одна транзакция на весь запрос.
+
+    Репозитории получают эту же сессию через ``get_async_session()``. Их
+    ``commit()`` только сбрасывает изменения в БД (``rollback_only``), а
+    фиксирует транзакцию сам scope — после успешного ответа эндпоинта.
+    Любое исключение (в т.ч. ``HTTPException``) откатывает всё целиком.
+    Если транзакцию откатили изнутри, а эндпоинт всё равно вернул ответ,
+    scope падает: отдать успех без сохранённых данных нельзя.
+    """
+    async with bind.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="rollback_only",
+        )
+        callbacks: list[Callable[[], Awaitable[None]]] = []
+        token = _request_session.set(session)
+        callbacks_token = _after_commit.set(callbacks)
+        try:
+            yield session
+            if not transaction.is_active:
+                raise RuntimeError("транзакция запроса откатана до завершения эндпоинта")
+            await session.flush()
+            await transaction.commit()
+        except BaseException:
+            if transaction.is_active:
+                await transaction.rollback()
+            raise
+        finally:
+            _after_commit.reset(callbacks_token)
+            _request_session.reset(token)
+            await session.close()
+
+        # данные уже зафиксированы: сбой эффекта не должен превращать ответ в ошибку
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as exc:
+                logger.error(f"[UOW] after-commit {callback!r} упал: {exc}")
+
+
+async def unit_of_work() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI-зависимость: unit-of-work запроса на primary."""
+    async with request_scope(engine) as session:
+        yield session
@@ -0,0 +1,200 @@
+"""Регрессия планов запросов: горячие выборки не должны уходить в Seq Scan.
+
+Запускается против локального Postgres, наполненного ``bulk_seed``::
+
+    python -m src.database.bulk_seed --products 20
+    python -m src.database.bulk_seed --users 20000 --phone-prefix 7977 --event-id 1 --purchases 25
+    python -m src.database.bulk_seed --users 5000 --phone-prefix 7966 --archives 10000
+    python -m src.database.explain_check --min-rows 10000
+
+Каждый запрос выполняется через ``EXPLAIN (ANALYZE, FORMAT JSON)`` в одной
+транзакции, которая откатывается (DELETE тоже безопасны). Для образца берётся
+самый «тяжёлый» пользователь/ивент. Таблицы меньше ``--min-rows`` пропускаются:
+на маленьких таблицах Seq Scan — законный выбор планировщика.
+Код выхода 1, если хотя бы один запрос читает проверяемую таблицу Seq Scan'ом.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from sqlalchemy import delete, desc, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.database.connection import engine
+from src.database.models import ProductItemModel, ProductModel, UnaddedProduct
+from src.events.models import EventHistoryModel, EventRatingModel
+from src.prizes.models import UnclaimedRewardModel
+from src.repository.transaction import TransactionRepository
+
+
+@dataclass(frozen=True)
+class PlanCase:
+    name: str
+    table: str
+    # SQL для выбора образца (id пользователя/ивента с наибольшим числом строк);
+    # колонки строки передаются в build по порядку
+    sample_sql: str
+    build: Callable[[Any], Any]
+
+
+CASES = (
+    PlanCase(
+        "transactions.list_by_user",
+        "transactions",
+        "SELECT id_user FROM transactions GROUP BY id_user ORDER BY count(*) DESC LIMIT 1",
+        lambda user_id: TransactionRepository.list_by_user_query(user_id, limit=51),
+    ),
+    PlanCase(
+        "transactions.list_by_user_keyset",
+        "transactions",
+        "SELECT id_user FROM transactions GROUP BY id_user ORDER BY count(*) DESC LIMIT 1",
+        lambda user_id: TransactionRepository.list_by_user_query(
+            user_id, limit=51, before=(datetime.now(timezone.utc) - timedelta(days=90), 2**31 - 1)
+        ),
+    ),
+    PlanCase(
+        "unadded_product.get_one",
+        "unadded_product",
+        "SELECT id_user FROM unadded_product GROUP BY id_user ORDER BY count(*) DESC LIMIT 1",
+        lambda user_id: select(UnaddedProduct).where(UnaddedProduct.id_user == user_id),
+    ),
+    PlanCase(
+        "unadded_product.grant_pending",
+        "unadded_product",
+        "SELECT id_user FROM unadded_product GROUP BY id_user ORDER BY count(*) DESC LIMIT 1",
+        lambda user_id: (
+            select(UnaddedProduct.id, ProductItemModel)
+            .join(ProductModel, ProductModel.id == UnaddedProduct.productId)
+            .join(ProductItemModel, ProductItemModel.id == ProductModel.id_product_item)
+            .where(UnaddedProduct.id_user == user_id)
+            .order_by(UnaddedProduct.id)
+            .with_for_update(of=UnaddedProduct, skip_locked=True)
+        ),
+    ),
+    PlanCase(
+        "event_ratings.top",
+        "event_ratings",
+        "SELECT event_id FROM event_ratings GROUP BY event_id ORDER BY count(*) DESC LIMIT 1",
+        lambda event_id: (
+            select(EventRatingModel.user_id, EventRatingModel.result)
+            .where(EventRatingModel.event_id == event_id)
+            .order_by(desc(EventRatingModel.result), EventRatingModel.user_id)
+            .limit(10)
+        ),
+    ),
+    PlanCase(
+        # как _place_of: сколько игроков впереди; образец — 100-е место самого
+        # большого ивента. Для последних мест счёт честно читает почти весь ивент
+        "event_ratings.place_of",
+        "event_ratings",
+        "SELECT event_id, result FROM event_ratings WHERE event_id = ("
+        "SELECT event_id FROM event_ratings GROUP BY event_id ORDER BY count(*) DESC LIMIT 1"
+        ") ORDER BY result DESC OFFSET 99 LIMIT 1",
+        lambda event_id, result: (
+            select(func.count())
+            .select_from(EventRatingModel)
+            .where(EventRatingModel.event_id == event_id, EventRatingModel.result > result)
+        ),
+    ),
+    PlanCase(
+        "event_history.latest",
+        "event_history",
+        "SELECT event_id FROM event_history GROUP BY event_id ORDER BY count(*) DESC LIMIT 1",
+        lambda event_id: (
+            select(EventHistoryModel.event_id, EventHistoryModel.results)
+            .where(EventHistoryModel.event_id.in_([event_id]))
+            .distinct(EventHistoryModel.event_id)
+            .order_by(EventHistoryModel.event_id, desc(EventHistoryModel.ended_at))
+        ),
+    ),
+    PlanCase(
+        "unclaimed_rewards.by_user",
+        "unclaimed_rewards",
+        "SELECT user_id FROM unclaimed_rewards GROUP BY user_id ORDER BY count(*) DESC LIMIT 1",
+        lambda user_id: select(UnclaimedRewardModel).where(UnclaimedRewardModel.user_id == user_id),
+    ),
+    PlanCase(
+        "unclaimed_rewards.delete_by_event",
+        "unclaimed_rewards",
+        "SELECT event_id FROM unclaimed_rewards GROUP BY event_id ORDER BY count(*) DESC LIMIT 1",
+        lambda event_id: delete(UnclaimedRewardModel).where(UnclaimedRewardModel.event_id == event_id),
+    ),
+)
+
+
+def _seq_scans(node: dict, table: str) -> list[str]:
+    """Узлы плана, которые читают ``table`` последовательным сканом."""
+    found = []
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") == table:
+        found.append(f"Seq Scan on {table} (rows={node.get('Actual Rows')})")
+    for child in node.get("Plans", ()):
+        found.extend(_seq_scans(child, table))
+    return found
+
+
+async def _row_count(connection: AsyncConnection, table: str) -> int:
+    return await connection.scalar(text(f"SELECT count(*) FROM {table}"))
+
+
+async def _check(connection: AsyncConnection, case: PlanCase, min_rows: int) -> bool | None:
+    """``True`` — индекс используется, ``False`` — Seq Scan, ``None`` — пропущено."""
+    rows = await _row_count(connection, case.table)
+    if rows < min_rows:
+        print(f"SKIP  {case.name:<36} {case.table}: {rows} rows < {min_rows}")
+        return None
+
+    sample = (await connection.execute(text(case.sample_sql))).first()
+    sql = str(
+        case.build(*sample).compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        )
+    )
+    plan = await connection.scalar(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))
+    # без типа колонки asyncpg отдаёт json строкой
+    root = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+    scans = _seq_scans(root["Plan"], case.table)
+    status = "FAIL" if scans else "OK"
+    print(f"{status:<5} {case.name:<36} {root['Execution Time']:>9.2f} ms  {'; '.join(scans)}")
+    return not scans
+
+
+async def main(args: argparse.Namespace) -> int:
+    failed = 0
+    try:
+        async with engine.connect() as connection:
+            transaction = await connection.begin()
+            try:
+                # свежая статистика — иначе планировщик оценивает строки вслепую
+                for table in sorted({case.table for case in CASES}):
+                    await connection.execute(text(f"ANALYZE {table}"))
+                for case in CASES:
+                    if args.only and args.only not in case.name:
+                        continue
+                    if await _check(connection, case, args.min_rows) is False:
+                        failed += 1
+            finally:
+                await transaction.rollback()
+    finally:
+        await engine.dispose()
+
+    if failed:
+        print(f"{failed} query plan(s) fell back to a sequential scan")
+    return 1 if failed else 0
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fail if hot queries use sequential scans.")
+    parser.add_argument("--min-rows", type=int, default=10_000, help="не проверять таблицы меньше этого размера")
+    parser.add_argument("--only", help="проверить только запросы, в имени которых есть эта подстрока")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(_parse_args())))
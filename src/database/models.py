@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, DateTime, Float, func, text
+from sqlalchemy import ForeignKey, DateTime, Float, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.database.connection import Base
@@ -119,14 +119,28 @@ class TransactionModel(Base):
     status: Mapped[str] = mapped_column(default="unknown")
     productId: Mapped[int] = mapped_column(ForeignKey("products.id"))
     id_user: Mapped[int] = mapped_column(ForeignKey("users.id"))
-    purchaseId: Mapped[str] = mapped_column(default="", index=True)
+    # уникален: повторный колбэк Билайна не может задвоить покупку
+    purchaseId: Mapped[str] = mapped_column(default="", index=True, unique=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
 
 
+# история покупок пользователя: фильтр + сортировка + keyset одним индексом
+Index(
+    "ix_transactions_user_created",
+    TransactionModel.id_user,
+    TransactionModel.created_at.desc(),
+    TransactionModel.id.desc(),
+)
+
+
 class UnaddedProduct(Base):
     __tablename__ = "unadded_product"  # ← snake_case, без дефиса
+    __table_args__ = (
+        # ожидающие начисления покупки пользователя в порядке поступления
+        Index("ix_unadded_product_user", "id_user", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     id_user: Mapped[int] = mapped_column(ForeignKey("users.id"))
@@ -0,0 +1,49 @@
+"""Пул соединений async-engine с метриками ожидания.
+
+Статистика — на процесс (воркер gunicorn): при 4 воркерах в Postgres уходит
+до ``4 * (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` соединений.
+"""
+
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class MeteredPool(AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool``, считающий выдачи соединений и время ожидания."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        self.checkouts += 1
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
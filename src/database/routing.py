@@ -0,0 +1,70 @@
+"""Маршрутизация read-only запросов на реплику с read-your-writes.
+
+После записи пользователь на ``DB_READ_YOUR_WRITES_TTL`` секунд помечается в
+Redis, и его чтения идут на primary, пока реплика не догонит. Без реплики
+(``DB_REPLICA_HOST`` не задан) всё работает как раньше — через primary.
+"""
+
+from typing import AsyncGenerator
+
+from fastapi import Header
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import DB_READ_YOUR_WRITES_TTL
+from src.database.connection import engine, replica_engine, request_scope
+from src.infra.logger import logger
+from src.infra.radis import redis_client
+from src.infra.token_cache import token_cache
+
+
+class ReadRouting:
+    """Пометки «пользователь недавно писал» и выбор engine для чтения."""
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"db:recent_write:{user_id}"
+
+    @classmethod
+    async def mark_write(cls, user_id: int) -> None:
+        """Вызывается путями записи: ближайшие чтения пользователя — с primary."""
+        if replica_engine is None:
+            return
+        try:
+            await redis_client.set(cls._key(user_id), 1, ex=DB_READ_YOUR_WRITES_TTL)
+        except RedisError as exc:
+            logger.warning(f"[DB_ROUTING] Не удалось пометить запись {user_id}: {exc}")
+
+    @classmethod
+    async def replica_allowed(cls, user_id: int | None) -> bool:
+        if replica_engine is None:
+            return False
+        if user_id is None:
+            return True
+        try:
+            return not await redis_client.exists(cls._key(user_id))
+        except RedisError as exc:
+            # не знаем, писал ли пользователь — безопаснее читать с primary
+            logger.warning(f"[DB_ROUTING] Redis недоступен, читаем с primary: {exc}")
+            return False
+
+
+async def read_session(
+    accessToken: str | None = Header(default=None, alias="accessToken"),
+) -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI-зависимость для read-only эндпоинтов.
+
+    Реплика используется, только если токен уже провалидирован в этом воркере
+    (иначе его проверка должна увидеть свежий логин на primary) и пользователь
+    не писал последние ``DB_READ_YOUR_WRITES_TTL`` секунд.
+    """
+    use_replica = False
+    if accessToken is None:
+        use_replica = await ReadRouting.replica_allowed(None)
+    else:
+        cached = token_cache.get(accessToken)
+        if cached is not None:
+            use_replica = await ReadRouting.replica_allowed(cached.id_user)
+
+    async with request_scope(replica_engine if use_replica else engine) as session:
+        yield session
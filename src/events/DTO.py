@@ -82,6 +82,12 @@ class CurrentUserInfo(BaseModel):
 class LeaderboardResponse(BaseModel):
     top: List[LeaderboardEntry]
     current_user: Optional[CurrentUserInfo] = None
+    # соседи игрока сверху и снизу (только при around_me)
+    around: Optional[List[LeaderboardEntry]] = None
+    # offset следующей страницы; None — страница последняя
+    next_offset: Optional[int] = None
+    # курсор следующей страницы для after (место в нём, offset не нужен)
+    next_after: Optional[str] = None
 
 
 __all__ = [
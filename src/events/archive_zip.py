@@ -0,0 +1,49 @@
+"""WitchBack — потоковая запись полного лидерборда в zip-архив.
+
+JSON-массив пишется в ``leaderboard.json`` кусками по мере чтения курсора,
+поэтому память не зависит от числа участников. Файл собирается во временном
+``*.tmp`` и атомарно подменяет прежний архив только в ``commit()``.
+Методы блокирующие — из async-кода вызываются через ``asyncio.to_thread``.
+"""
+
+import json
+import os
+import zipfile
+from pathlib import Path
+from typing import Iterable
+
+MEMBER_NAME = "leaderboard.json"
+
+
+class JsonArrayZip:
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._zip = zipfile.ZipFile(self._tmp_path, "w")
+        # размер заранее неизвестен — сразу zip64, иначе упадём после 2 ГиБ
+        self._fp = self._zip.open(MEMBER_NAME, "w", force_zip64=True)
+        self._fp.write(b"[")
+        self._empty = True
+
+    def write(self, items: Iterable[dict]) -> None:
+        chunk = ",".join(json.dumps(item, ensure_ascii=False) for item in items)
+        if not chunk:
+            return
+        if not self._empty:
+            chunk = "," + chunk
+        self._empty = False
+        self._fp.write(chunk.encode("utf-8"))
+
+    def commit(self) -> None:
+        self._fp.write(b"]")
+        self._fp.close()
+        self._zip.close()
+        os.replace(self._tmp_path, self._path)
+
+    def abort(self) -> None:
+        try:
+            self._fp.close()
+            self._zip.close()
+        finally:
+            self._tmp_path.unlink(missing_ok=True)
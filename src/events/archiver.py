@@ -0,0 +1,69 @@
+"""WitchBack — фоновая архивация завершившихся ивентов.
+
+Задача планировщика крутится в каждом воркере; ровно одну архивацию события
+гарантирует транзакционный advisory-лок Postgres на его id. Всё (история,
+призы, удаление рейтинга) пишется одной транзакцией — либо целиком, либо никак.
+"""
+
+from sqlalchemy import exists, func, select
+
+from src.database.connection import async_session_maker
+from src.events.leaderboard import RedisLeaderboard
+from src.events.listing import EventListingCache
+from src.events.models import EventRatingModel
+from src.events.repository import EventRatingCore
+from src.infra.logger import logger
+
+# Пространство ключей advisory-локов архивации: pg_try_advisory_xact_lock(ns, event_id)
+_LOCK_NAMESPACE = 0x41524348  # "ARCH"
+
+
+class EventArchiver:
+
+    @staticmethod
+    async def run_once() -> int:
+        """Архивирует все завершившиеся ивенты; возвращает число заархивированных."""
+        try:
+            async with async_session_maker() as session:
+                event_ids = await EventRatingCore(session).expired_event_ids()
+        except Exception as exc:
+            logger.error(f"[ARCHIVE] Не удалось получить список ивентов: {exc}")
+            return 0
+
+        archived = 0
+        for event_id in event_ids:
+            try:
+                if await EventArchiver.archive_event(event_id):
+                    archived += 1
+            except Exception as exc:
+                # транзакция откатилась целиком — повторим на следующем тике
+                logger.error(f"[ARCHIVE] Ошибка архивации ивента {event_id}: {exc}")
+
+        if archived:
+            # в списке появятся телефоны победителей
+            await EventListingCache.invalidate()
+        return archived
+
+    @staticmethod
+    async def archive_event(event_id: int) -> bool:
+        """``False`` — ивент архивирует другой воркер или он уже заархивирован."""
+        async with async_session_maker() as session:
+            async with session.begin():
+                locked = await session.scalar(
+                    select(func.pg_try_advisory_xact_lock(_LOCK_NAMESPACE, event_id))
+                )
+                if not locked:
+                    return False
+
+                # пока мы ждали, другой воркер мог закончить и закоммитить
+                pending = await session.scalar(
+                    select(exists().where(EventRatingModel.event_id == event_id))
+                )
+                if not pending:
+                    return False
+
+                await EventRatingCore(session).archive_event_results(event_id)
+
+        await RedisLeaderboard.drop(event_id)
+        logger.info(f"[ARCHIVE] Ивент {event_id} заархивирован")
+        return True
@@ -0,0 +1,241 @@
+"""WitchBack — лидерборд ивентов на Redis sorted sets.
+
+Postgres (``event_ratings``) остаётся источником истины: каждый submit пишет
+итоговый результат игрока в sorted set (write-through), а пустой/холодный
+ключ прогревается из БД одним проходом. Чтение топ-N и места игрока — O(log N).
+"""
+
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterable, Optional
+
+from redis.exceptions import RedisError
+
+from src.infra.logger import logger
+from src.infra.radis import redis_client
+
+# Сколько держим лидерборд после окончания ивента (архивация удаляет раньше)
+_KEEP_AFTER_END = timedelta(days=2)
+# Размер пачки ZADD при прогреве
+_WARM_CHUNK = 1000
+# Лок прогрева: один воркер читает event_ratings, остальные пока читают из БД
+_WARM_LOCK_TTL_MS = 30_000
+# user_id — int4, в 10 цифр помещается с запасом
+_ID_CEIL = 9_999_999_999
+
+
+class RedisLeaderboard:
+    """Sorted set ``leaderboard:{event_id}:ranks``: score — result, member — user_id.
+
+    Равные score Redis упорядочивает по строке member, а при обратном порядке
+    (``desc``) ещё и разворачивает это сравнение. Поэтому member — user_id,
+    дополненный нулями до 10 цифр, а для ``desc``-ивентов ещё и ``_ID_CEIL - user_id``.
+    Тогда при равенстве результатов меньший user_id всегда выше, как в
+    ``_rating_order`` и при архивации.
+
+    Ключ ``...:ranks:ready`` ставится только после полного прогрева из Postgres.
+    Пока его нет, частично заполненный set не используется для чтения.
+    Любая ошибка Redis логируется, а вызывающий код откатывается на Postgres.
+    """
+
+    @staticmethod
+    def _key(event_id: int) -> str:
+        return f"leaderboard:{event_id}:ranks"
+
+    @staticmethod
+    def _ready_key(event_id: int) -> str:
+        return f"leaderboard:{event_id}:ranks:ready"
+
+    @staticmethod
+    def _warm_lock_key(event_id: int) -> str:
+        return f"leaderboard:{event_id}:ranks:warming"
+
+    @staticmethod
+    def _member(user_id: int, order_desc: bool) -> str:
+        return f"{_ID_CEIL - user_id if order_desc else user_id:010d}"
+
+    @staticmethod
+    def _user_id(member: str, order_desc: bool) -> int:
+        value = int(member)
+        return _ID_CEIL - value if order_desc else value
+
+    @staticmethod
+    def _expire_at(end_date: datetime) -> int:
+        return int((end_date + _KEEP_AFTER_END).timestamp())
+
+    @classmethod
+    async def is_ready(cls, event_id: int) -> Optional[bool]:
+        """``None`` — Redis недоступен (прогревать бессмысленно)."""
+        try:
+            return bool(await redis_client.exists(cls._ready_key(event_id)))
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD] Redis недоступен ({event_id}): {exc}")
+            return None
+
+    @classmethod
+    async def warm(
+        cls,
+        event_id: int,
+        load_rows: Callable[[], Awaitable[Iterable[tuple[int, float]]]],
+        end_date: datetime,
+        order_desc: bool,
+    ) -> bool:
+        """Залить результаты из Postgres и пометить лидерборд готовым.
+
+        Гонка с ``set_result`` решается так: set очищается *до* чтения БД,
+        а прогрев пишет ``ZADD NX``. Всё, что ``set_result`` запишет после
+        очистки, — закоммиченный итог не старше прочитанного, и прогрев его
+        не перезапишет. Одновременно прогревает один воркер (лок ``SET NX``).
+        """
+        key = cls._key(event_id)
+        lock_key = cls._warm_lock_key(event_id)
+        expire_at = cls._expire_at(end_date)
+        try:
+            if not await redis_client.set(lock_key, 1, nx=True, px=_WARM_LOCK_TTL_MS):
+                return False
+            # остатки прерванного прогрева могли устареть
+            await redis_client.delete(key)
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD] Не удалось начать прогрев {key}: {exc}")
+            return False
+
+        try:
+            rows = await load_rows()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                chunk: dict[str, float] = {}
+                for user_id, result in rows:
+                    chunk[cls._member(user_id, order_desc)] = float(result)
+                    if len(chunk) >= _WARM_CHUNK:
+                        pipe.zadd(key, chunk, nx=True)
+                        chunk = {}
+                if chunk:
+                    pipe.zadd(key, chunk, nx=True)
+                pipe.expireat(key, expire_at)
+                pipe.set(cls._ready_key(event_id), 1)
+                pipe.expireat(cls._ready_key(event_id), expire_at)
+                await pipe.execute()
+            logger.info(f"[LEADERBOARD] WARM {key}")
+            return True
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD] Не удалось прогреть {key}: {exc}")
+            return False
+        finally:
+            try:
+                await redis_client.delete(lock_key)
+            except RedisError:
+                pass  # лок истечёт сам
+
+    @classmethod
+    async def set_result(
+        cls,
+        event_id: int,
+        user_id: int,
+        total: float,
+        end_date: datetime,
+        order_desc: bool,
+    ) -> None:
+        """Write-through итогового результата из Postgres.
+
+        Пишем абсолютное значение (ZADD), а не приращение: повторная доставка
+        или гонка с прогревом не могут задвоить результат.
+        """
+        key = cls._key(event_id)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zadd(key, {cls._member(user_id, order_desc): float(total)})
+                pipe.expireat(key, cls._expire_at(end_date))
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD] Не удалось записать {key}/{user_id}: {exc}")
+
+    @classmethod
+    async def top(
+        cls,
+        event_id: int,
+        limit: int,
+        order_desc: bool,
+        offset: int = 0,
+    ) -> Optional[list[tuple[int, float]]]:
+        """Топ ``limit`` игроков начиная с ``offset`` или ``None`` при ошибке Redis."""
+        try:
+            rows = await redis_client.zrange(
+                cls._key(event_id),
+                offset,
+                offset + limit - 1,
+                desc=order_desc,
+                withscores=True,
+            )
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD] Ошибка чтения топа {event_id}: {exc}")
+            return None
+        return [(cls._user_id(member, order_desc), float(score)) for member, score in rows]
+
+    @classmethod
+    async def rank(
+        cls,
+        event_id: int,
+        user_id: int,
+        order_desc: bool,
+    ) -> Optional[tuple[int, float]]:
+        """(place, result) игрока; ``None`` — игрока нет или Redis недоступен."""
+        key = cls._key(event_id)
+        member = cls._member(user_id, order_desc)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                if order_desc:
+                    pipe.zrevrank(key, member)
+                else:
+                    pipe.zrank(key, member)
+                pipe.zscore(key, member)
+                position, score = await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD] Ошибка чтения места {event_id}/{user_id}: {exc}")
+            return None
+        if position is None or score is None:
+            return None
+        return int(position) + 1, float(score)
+
+    @classmethod
+    async def rows_through(
+        cls,
+        event_id: int,
+        result: float,
+        user_id: int,
+        order_desc: bool,
+    ) -> Optional[int]:
+        """Сколько игроков стоит не ниже строки ``(result, user_id)``; ``None`` — ошибка Redis.
+
+        Это ранг, с которого начинается следующая страница после курсора.
+        Если строка на месте — один ZRANK; если игрок с тех пор сменил
+        результат — ZCOUNT лучших плюс равные с меньшим или тем же user_id.
+        """
+        key = cls._key(event_id)
+        member = cls._member(user_id, order_desc)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                if order_desc:
+                    pipe.zrevrank(key, member)
+                else:
+                    pipe.zrank(key, member)
+                pipe.zscore(key, member)
+                position, score = await pipe.execute()
+            if position is not None and score is not None and float(score) == result:
+                return int(position) + 1
+
+            async with redis_client.pipeline(transaction=False) as pipe:
+                if order_desc:
+                    pipe.zcount(key, f"({result!r}", "+inf")
+                else:
+                    pipe.zcount(key, "-inf", f"({result!r}")
+                pipe.zrangebyscore(key, result, result)
+                better, tied = await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD] Ошибка чтения позиции {event_id}/{user_id}: {exc}")
+            return None
+        return int(better) + sum(1 for m in tied if cls._user_id(m, order_desc) <= user_id)
+
+    @classmethod
+    async def drop(cls, event_id: int) -> None:
+        try:
+            await redis_client.delete(cls._key(event_id), cls._ready_key(event_id))
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD] Не удалось удалить лидерборд {event_id}: {exc}")
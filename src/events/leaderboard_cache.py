@@ -0,0 +1,161 @@
+"""WitchBack — короткоживущий кэш страниц лидерборда, общий для воркеров.
+
+Страница (топ-N с ``offset``, стратегия сортировки, карта призов) собирается
+один раз и лежит в Redis ``LEADERBOARD_CACHE_TTL`` секунд. Каждый submit
+увеличивает версию ивента, но страница моложе ``LEADERBOARD_CACHE_MIN_AGE``
+отдаётся и при новой версии — так поток результатов в турнире схлопывается
+в одну пересборку на окно (micro-batching), а не по одной на submit.
+
+Одновременные промахи сводятся к одной пересборке: внутри воркера — общий
+future, между воркерами — ``SET NX`` лок в Redis.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from redis.exceptions import RedisError
+
+from config import LEADERBOARD_CACHE_MIN_AGE, LEADERBOARD_CACHE_TTL
+from src.infra.logger import logger
+from src.infra.radis import redis_client
+
+# Сколько держим лок пересборки и сколько ждём чужую пересборку
+_LOCK_TTL_MS = 2000
+_WAIT_STEP = 0.05
+_WAIT_STEPS = 10
+# Потолок локальных записей (страницы с разными offset/limit), вытеснение LRU
+_LOCAL_MAX = 1000
+# Версия живёт дольше любого ивента-дня; сбрасывается вместе с ивентом
+_VERSION_TTL = 7 * 24 * 3600
+
+
+class LeaderboardPageCache:
+
+    _local: OrderedDict[str, dict] = OrderedDict()
+    _inflight: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _version_key(event_id: int) -> str:
+        return f"leaderboard:{event_id}:version"
+
+    @staticmethod
+    def _page_key(event_id: int, offset: int, limit: int, after: tuple | None = None) -> str:
+        key = f"leaderboard:{event_id}:page:{offset}:{limit}"
+        # страница по курсору — отдельная запись: чужой курсор не подменит общую
+        # (локально такие не храним — см. get)
+        return f"{key}:{':'.join(map(repr, after))}" if after else key
+
+    @staticmethod
+    def _is_fresh(entry: dict, version: str | None) -> bool:
+        age = time.time() - entry["t"]
+        if age >= LEADERBOARD_CACHE_TTL:
+            return False
+        return entry["v"] == version or age < LEADERBOARD_CACHE_MIN_AGE
+
+    @classmethod
+    async def bump(cls, event_id: int) -> None:
+        """Вызывается из submit: рейтинг изменился."""
+        key = cls._version_key(event_id)
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, _VERSION_TTL)
+                await pipe.execute()
+        except RedisError as exc:
+            # страница всё равно протухнет по TTL
+            logger.warning(f"[LEADERBOARD_CACHE] Не удалось увеличить версию {event_id}: {exc}")
+
+    @classmethod
+    async def get(
+        cls,
+        event_id: int,
+        offset: int,
+        limit: int,
+        build: Callable[[], Awaitable[dict]],
+        after: tuple | None = None,
+    ) -> dict:
+        key = cls._page_key(event_id, offset, limit, after)
+        version = await cls._current_version(event_id)
+
+        entry = cls._local.get(key)
+        if entry is not None and cls._is_fresh(entry, version):
+            cls._local.move_to_end(key)
+            return entry["p"]
+
+        # single-flight внутри воркера
+        inflight = cls._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        cls._inflight[key] = future
+        try:
+            entry = await cls._load_or_build(key, version, build)
+            # курсоры присылает клиент, их пространство не ограничено — такие
+            # страницы живут только в Redis (с TTL) и не вытесняют общие
+            if after is None:
+                cls._local[key] = entry
+                cls._local.move_to_end(key)
+                while len(cls._local) > _LOCAL_MAX:
+                    cls._local.popitem(last=False)
+            future.set_result(entry["p"])
+            return entry["p"]
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # ошибку получает каждый ожидающий, не логируем как потерянную
+            raise
+        finally:
+            cls._inflight.pop(key, None)
+
+    @classmethod
+    async def _current_version(cls, event_id: int) -> str | None:
+        try:
+            return await redis_client.get(cls._version_key(event_id))
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD_CACHE] Redis недоступен ({event_id}): {exc}")
+            return None
+
+    @classmethod
+    async def _load_shared(cls, key: str, version: str | None) -> dict | None:
+        raw = await redis_client.get(key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry if cls._is_fresh(entry, version) else None
+
+    @classmethod
+    async def _load_or_build(
+        cls,
+        key: str,
+        version: str | None,
+        build: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        lock_key = f"{key}:lock"
+        locked = False
+        try:
+            entry = await cls._load_shared(key, version)
+            if entry is not None:
+                return entry
+
+            # между воркерами: строит один, остальные коротко ждут его результат
+            locked = bool(await redis_client.set(lock_key, 1, nx=True, px=_LOCK_TTL_MS))
+            if not locked:
+                for _ in range(_WAIT_STEPS):
+                    await asyncio.sleep(_WAIT_STEP)
+                    entry = await cls._load_shared(key, version)
+                    if entry is not None:
+                        return entry
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD_CACHE] Redis недоступен, считаем без кэша: {exc}")
+
+        entry = {"v": version, "t": time.time(), "p": await build()}
+        try:
+            await redis_client.set(key, json.dumps(entry, ensure_ascii=False), px=int(LEADERBOARD_CACHE_TTL * 1000))
+            if locked:
+                await redis_client.delete(lock_key)
+        except RedisError as exc:
+            logger.warning(f"[LEADERBOARD_CACHE] Не удалось сохранить {key}: {exc}")
+        return entry
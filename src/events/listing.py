@@ -0,0 +1,118 @@
+"""WitchBack — предрассчитанный снапшот списка ивентов (``/api/event/current``).
+
+Готовые JSON-байты живут в памяти воркера и в Redis (общие для всех воркеров).
+Снапшот пересобирается:
+  * после ``invalidate()`` — правка ивентов/призов, архивация;
+  * на ближайшей границе окна показа: start−1 день, end (появляются
+    победители), end+1 день;
+  * не реже ``EVENTS_LISTING_MAX_AGE`` — страховка от правок в БД в обход приложения.
+"""
+
+import asyncio
+import time
+
+from redis.exceptions import RedisError
+
+from config import EVENTS_LISTING_MAX_AGE
+from src.database.connection import get_read_session
+from src.events.repository import EventRatingCore
+from src.infra.logger import logger
+from src.infra.radis import redis_client
+from src.infra.snapshot import Snapshot, dump_json
+
+# Пересобираем чуть позже границы, чтобы сравнения в запросе уже сработали
+_BOUNDARY_GRACE = 1.0
+# Не даём пересборке уйти в цикл, если граница «прямо сейчас»
+_MIN_TTL = 1.0
+
+
+class EventListingCache:
+    """Список текущих ивентов как ``Snapshot``; версия — ключ в Redis."""
+
+    VERSION_KEY = "events:listing:version"
+    SNAPSHOT_KEY = "events:listing:snapshot"
+
+    _snapshot: Snapshot | None = None
+    _lock = asyncio.Lock()
+
+    @classmethod
+    async def get(cls) -> Snapshot:
+        version = await cls._current_version()
+        snapshot = cls._snapshot
+        if snapshot is not None and snapshot.is_fresh(version):
+            return snapshot
+
+        # одна пересборка на воркер, остальные ждут её результат
+        async with cls._lock:
+            snapshot = cls._snapshot
+            if snapshot is not None and snapshot.is_fresh(version):
+                return snapshot
+            snapshot = await cls._load_shared(version) or await cls._rebuild(version)
+            cls._snapshot = snapshot
+            return snapshot
+
+    @classmethod
+    async def invalidate(cls) -> None:
+        cls._snapshot = None
+        try:
+            await redis_client.incr(cls.VERSION_KEY)
+        except RedisError as exc:
+            logger.warning(f"[EVENTS_LISTING] Не удалось увеличить версию: {exc}")
+
+    @classmethod
+    async def _current_version(cls) -> str | None:
+        try:
+            return await redis_client.get(cls.VERSION_KEY)
+        except RedisError as exc:
+            logger.warning(f"[EVENTS_LISTING] Redis недоступен, живём по TTL: {exc}")
+            return cls._snapshot.version if cls._snapshot is not None else None
+
+    @classmethod
+    async def _load_shared(cls, version: str | None) -> Snapshot | None:
+        """Снапшот, уже собранный другим воркером."""
+        try:
+            data = await redis_client.hgetall(cls.SNAPSHOT_KEY)
+        except RedisError as exc:
+            logger.warning(f"[EVENTS_LISTING] Не удалось прочитать снапшот: {exc}")
+            return None
+        if not data or data.get("version") != (version or ""):
+            return None
+        ttl = float(data["valid_until"]) - time.time()
+        if ttl <= 0:
+            return None
+        return Snapshot(data["body"].encode("utf-8"), version, ttl)
+
+    @classmethod
+    async def _rebuild(cls, version: str | None) -> Snapshot:
+        async with get_read_session() as session:
+            core = EventRatingCore(session)
+            events = await core.get_current_events_with_prizes()
+            boundary = await core.next_listing_boundary()
+
+        body = dump_json(
+            [ev.model_dump(mode="json", by_alias=True, exclude_none=True) for ev in events]
+        )
+        now = time.time()
+        valid_until = now + EVENTS_LISTING_MAX_AGE
+        if boundary is not None:
+            valid_until = min(valid_until, boundary.timestamp() + _BOUNDARY_GRACE)
+        ttl = max(valid_until - now, _MIN_TTL)
+
+        snapshot = Snapshot(body, version, ttl)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(
+                    cls.SNAPSHOT_KEY,
+                    mapping={
+                        "body": body.decode("utf-8"),
+                        "version": version or "",
+                        "valid_until": now + ttl,
+                    },
+                )
+                pipe.expire(cls.SNAPSHOT_KEY, int(ttl) + 1)
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"[EVENTS_LISTING] Не удалось сохранить снапшот: {exc}")
+
+        logger.info(f"[EVENTS_LISTING] rebuilt version={version} ttl={ttl:.0f}s etag={snapshot.etag}")
+        return snapshot
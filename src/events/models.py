@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import ForeignKey, DateTime, JSON
+from sqlalchemy import ForeignKey, DateTime, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Mapped, mapped_column
 from src.database.connection import Base
@@ -49,6 +49,12 @@ class PrizeModel(Base):
 
 class EventRatingModel(Base):
     __tablename__ = "event_ratings"
+    __table_args__ = (
+        # один аккумулированный результат на игрока в ивенте
+        UniqueConstraint("event_id", "user_id", name="uq_event_ratings_event_user"),
+        # топ-N и подсчёт места без полного скана
+        Index("ix_event_ratings_event_result", "event_id", "result"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id"))
@@ -58,6 +64,10 @@ class EventRatingModel(Base):
 
 class EventHistoryModel(Base):
     __tablename__ = "event_history"
+    __table_args__ = (
+        # последний архив события (DISTINCT ON event_id ... ended_at DESC)
+        Index("ix_event_history_event_ended", "event_id", "ended_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id"))
@@ -14,9 +14,9 @@ class RedisEventCache:
         return f"event_info:{event_id}"
 
     @classmethod
-    def get(cls, event_id: int) -> EventModel | None:
+    async def get(cls, event_id: int) -> EventModel | None:
         key = cls._key(event_id)
-        data = redis_client.get(key)
+        data = await redis_client.get(key)
         if not data:
             logger.info(f"[REDIS] MISS {key}")
             return None
@@ -37,7 +37,7 @@ class RedisEventCache:
             return None
 
     @classmethod
-    def set(cls, event_id: int, event: EventModel, expires_at: datetime):
+    async def set(cls, event_id: int, event: EventModel, expires_at: datetime):
         key = cls._key(event_id)
         ttl = int((expires_at - Time.now()).total_seconds())
         if ttl <= 0:
@@ -51,17 +51,17 @@ class RedisEventCache:
             "logo": event.logo,
             "level_ids": event.level_ids,
         }
-        redis_client.set(key, json.dumps(data), ex=ttl)
+        await redis_client.set(key, json.dumps(data), ex=ttl)
         logger.info(f"[REDIS] SET {key}, TTL: {ttl}s")
 
     @staticmethod
     async def set_json(key: str, value: Any, ex: int | None = None):
         json_value = json.dumps(value, ensure_ascii=False)
-        redis_client.set(key, json_value, ex=ex)
+        await redis_client.set(key, json_value, ex=ex)
 
     @staticmethod
     async def get_json(key: str) -> Any:
-        data = redis_client.get(key)
+        data = await redis_client.get(key)
         if data is None:
             return None
         return json.loads(data)
@@ -6,16 +6,19 @@ Rewards передаётся как плоский dict.
 
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-import json
-import zipfile
+import asyncio
+import math
 from typing import List, Optional, Dict, Union
 
 from fastapi import HTTPException
 
-from sqlalchemy import select, delete, desc
+from sqlalchemy import select, delete, desc, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import EVENT_ARCHIVE_BATCH
+
 from src.events.models import (
     EventModel,
     EventRatingModel,
@@ -24,16 +27,75 @@ from src.events.models import (
     PrizeModel,  # ← вернул импорт для фолбэка
 )
 from src.events.DTO import EventPublicDTO, LeaderboardEntry
+from src.events.archive_zip import JsonArrayZip
+from src.events.leaderboard import RedisLeaderboard
+from src.events.leaderboard_cache import LeaderboardPageCache
 from src.database.models import UserModel
+from src.database.connection import after_commit
+from src.database.routing import ReadRouting
 from src.prizes.prizes_repository import PrizesCore
 
 
+def _rating_order(order_desc: bool) -> tuple:
+    """ORDER BY для рейтинга: результат по стратегии, при равенстве — user_id."""
+    result_order = EventRatingModel.result.desc() if order_desc else EventRatingModel.result.asc()
+    return result_order, EventRatingModel.user_id.asc()
+
+
+def _neighbours(result: float, user_id: int, order_desc: bool) -> tuple:
+    """Условия (ahead, behind): игроки выше/ниже строки ``(result, user_id)``.
+
+    Тот же порядок, что ``_rating_order``; по ним идут keyset-запросы с LIMIT
+    без OFFSET — окно вокруг игрока и страницы из БД по курсору.
+    """
+    res_col, uid_col = EventRatingModel.result, EventRatingModel.user_id
+    same_ahead = (res_col == result) & (uid_col < user_id)
+    same_behind = (res_col == result) & (uid_col > user_id)
+    if order_desc:
+        return (res_col > result) | same_ahead, (res_col < result) | same_behind
+    return (res_col < result) | same_ahead, (res_col > result) | same_behind
+
+
+def _rating_cursor(entry: dict) -> str:
+    """``next_after``: место, результат и user_id последней строки страницы."""
+    return f"{entry['place']},{entry['result']!r},{entry['user_id']}"
+
+
+def _parse_rating_cursor(after: str) -> tuple[int, float, int]:
+    """``<place>,<result>,<user_id>`` из ``next_after`` прошлой страницы."""
+    try:
+        place, result, user_id = after.split(",")
+        parsed = int(place), float(result), int(user_id)
+    except ValueError:
+        parsed = None
+    if parsed is None or parsed[0] < 1 or not math.isfinite(parsed[1]):
+        raise HTTPException(status_code=422, detail="after must be '<place>,<result>,<user_id>'")
+    return parsed
+
+
 def _prepare_rewards(rew: Optional[dict]) -> Optional[dict]:
     if not rew:
         return None
     return dict(rew)
 
 
+def _leaderboard_entry(
+    place: int,
+    user_id: int,
+    result: float,
+    prize_map: Dict[int, dict],
+    id_to_phone: Dict[int, Optional[str]],
+) -> dict:
+    phone = id_to_phone.get(user_id)
+    return {
+        "user_id": user_id,
+        "result": float(result),
+        "place": place,
+        "rewards": _prepare_rewards(prize_map.get(place)),
+        "user_name": LeaderboardEntry._mask(phone) if phone else None,
+    }
+
+
 class EventRatingCore:
     """Основная бизнес-логика для работы с ивентами."""
 
@@ -42,27 +104,25 @@ class EventRatingCore:
         self.prizes_core = PrizesCore(session)
 
     # ------------------------------------------------------------------
-    # АРХИВАЦИЯ ВСЕХ ЗАВЕРШИВШИХСЯ ИВЕНТОВ
+    # ЗАВЕРШИВШИЕСЯ ИВЕНТЫ, ОЖИДАЮЩИЕ АРХИВАЦИИ
     # ------------------------------------------------------------------
-    async def archive_expired_events(self) -> None:
+    async def expired_event_ids(self) -> List[int]:
+        """Ивенты, которые закончились и ещё имеют активные результаты."""
         now = datetime.now(timezone.utc)
-
-        # выберем все события, которые закончились и ещё имеют результаты
-        subq = (
-            select(EventRatingModel.event_id)
-            .group_by(EventRatingModel.event_id)
-            .subquery()
+        return list(
+            (
+                await self.session.execute(
+                    select(EventModel.id)
+                    .where(EventModel.end_date < now)
+                    .where(
+                        EventModel.id.in_(
+                            select(EventRatingModel.event_id).distinct()
+                        )
+                    )
+                    .order_by(EventModel.id)
+                )
+            ).scalars()
         )
-        events_to_archive = (
-            await self.session.execute(
-                select(EventModel)
-                .where(EventModel.end_date < now)
-                .where(EventModel.id.in_(select(subq.c.event_id)))
-            )
-        ).scalars().all()
-
-        for ev in events_to_archive:
-            await self.archive_event_results(ev.id)
 
     # ------------------------------------------------------------------
     # ТЕКУЩИЕ СОБЫТИЯ + ПРИЗЫ (+ телефоны победителей для закрытых)
@@ -77,7 +137,6 @@ class EventRatingCore:
         now = datetime.now(timezone.utc)
         preview_start = now + timedelta(days=1)    # показываем за 1 день до старта
         cutoff = now - timedelta(days=1)           # и ещё 1 день после конца
-        await self.archive_expired_events()
 
         stmt = (
             select(EventModel)
@@ -95,19 +154,20 @@ class EventRatingCore:
             (await self.session.execute(select(PrizeModel).where(PrizeModel.event_id == -1)))
         ).scalars().all()
 
+        # {event_id: {place: phone}} для всех закрытых — двумя запросами вместо N+1
+        closed_ids = [ev.id for ev in events if ev.end_date < now]
+        try:
+            winner_phones = await self._load_winner_phones_bulk(closed_ids)
+        except Exception:
+            winner_phones = {}
+
         enriched: list[EventPublicDTO] = []
         for ev in events:
-            # берём {place: phone} из последнего архива и маскируем как в лидерборде
-            phones_by_place: Dict[int, str] = {}
-            if ev.end_date < now:
-                try:
-                    raw = await self._load_winner_phones(ev.id)
-                    phones_by_place = {
-                        place: LeaderboardEntry._mask(ph) if ph else ph
-                        for place, ph in raw.items()
-                    }
-                except Exception:
-                    phones_by_place = {}
+            # маскируем телефоны победителей как в лидерборде
+            phones_by_place: Dict[int, str] = {
+                place: LeaderboardEntry._mask(ph) if ph else ph
+                for place, ph in winner_phones.get(ev.id, {}).items()
+            }
 
             # локальные призы или дефолтные
             prizes = ev.prizes if ev.prizes else default_prizes
@@ -148,6 +208,27 @@ class EventRatingCore:
     # alias на старое имя (если где-то используется)
     get_all_active_events_with_prizes = get_current_events_with_prizes
 
+    async def next_listing_boundary(self) -> Optional[datetime]:
+        """Ближайший момент, когда изменится список текущих ивентов.
+
+        Границы окна показа: start−1 день (превью), end (закрытие, телефоны
+        победителей) и end+1 день (ивент пропадает из списка).
+        """
+        now = datetime.now(timezone.utc)
+        rows = (
+            await self.session.execute(
+                select(EventModel.start_date, EventModel.end_date)
+                .where(EventModel.end_date >= now - timedelta(days=1))
+            )
+        ).all()
+        boundaries = [
+            moment
+            for start, end in rows
+            for moment in (start - timedelta(days=1), end, end + timedelta(days=1))
+            if moment > now
+        ]
+        return min(boundaries, default=None)
+
     # ------------------------------------------------------------------
     # ДОБАВЛЕНИЕ/АККУМУЛЯЦИИ РЕЗУЛЬТАТА И ПОДСЧЁТ МЕСТА
     # ------------------------------------------------------------------
@@ -177,38 +258,28 @@ class EventRatingCore:
         if end_date < now:
             raise HTTPException(status_code=501, detail="EVENT_CLOSED")
 
-        # upsert результата
-        existing = await self.session.scalar(
-            select(EventRatingModel).where(
-                EventRatingModel.event_id == event_id,
-                EventRatingModel.user_id == user_id,
-            )
+        # атомарный upsert: один запрос, без гонок между воркерами
+        insert_stmt = pg_insert(EventRatingModel).values(
+            event_id=event_id, user_id=user_id, result=float(result)
         )
-        if existing:
-            existing.result = float(existing.result) + float(result)
-            new_total = existing.result
-        else:
-            row = EventRatingModel(event_id=event_id, user_id=user_id, result=float(result))
-            self.session.add(row)
-            new_total = row.result
-
+        stmt = insert_stmt.on_conflict_do_update(
+            constraint="uq_event_ratings_event_user",
+            set_={"result": EventRatingModel.result + insert_stmt.excluded.result},
+        ).returning(EventRatingModel.result)
+        new_total = await self.session.scalar(stmt)
         await self.session.commit()
-
-        # пересчёт места
         order_desc = COMPARE_STRATEGY.get(event_type, "higher") == "higher"
-        rows = (
-            await self.session.execute(
-                select(EventRatingModel.user_id, EventRatingModel.result)
-                .where(EventRatingModel.event_id == event_id)
-                .order_by(EventRatingModel.result.desc() if order_desc else EventRatingModel.result.asc())
-            )
-        ).all()
 
-        place = 1
-        for idx, (uid, _res) in enumerate(rows, start=1):
-            if uid == user_id:
-                place = idx
-                break
+        async def publish() -> None:
+            # write-through только закоммиченного итога (и после снятия блокировки строки)
+            await RedisLeaderboard.set_result(event_id, user_id, new_total, end_date, order_desc)
+            await LeaderboardPageCache.bump(event_id)
+            await ReadRouting.mark_write(user_id)
+
+        await after_commit(publish)
+
+        # место = сколько игроков впереди + 1 (индекс (event_id, result))
+        place = await self._place_of(event_id, user_id, new_total, order_desc)
 
         return float(new_total), int(place)
 
@@ -240,163 +311,386 @@ class EventRatingCore:
         event_id: int,
         current_user_id: int | None = None,
         top_n: int = 10,
+        offset: int | None = None,
+        around_me: int | None = None,
+        after: str | None = None,
     ):
-        prize_map = await self._load_prizes_map(event_id)
+        """Страница рейтинга, место игрока и (опционально) окно вокруг него.
+
+        Возвращает ``(page, current, around)``: ``page`` — ``top`` из ``top_n``
+        записей начиная с ``offset`` и ``next_offset``/``next_after`` следующей
+        страницы (``None`` на последней); ``around`` — до ``around_me`` соседей
+        сверху и снизу вместе с самим игроком (``None``, если окно не запрошено
+        или игрока нет).
+
+        ``after`` — ``next_after`` прошлой страницы: место и ключ её последней
+        строки. Страница — строки строго после этого ключа (в Redis и в БД
+        одинаково), места — от места курсора; ``offset``, если передан, должен
+        с ним совпадать. Страница общая для всех и берётся из
+        ``LeaderboardPageCache``; место и окно игрока считаются поверх неё по
+        рангу — O(log N).
+        """
+        cursor = _parse_rating_cursor(after) if after else None
+        if cursor is not None:
+            if offset is not None and offset != cursor[0]:
+                raise HTTPException(status_code=422, detail="offset does not match after")
+            offset = cursor[0]
+        offset = offset or 0
+
+        cached = await LeaderboardPageCache.get(
+            event_id,
+            offset,
+            top_n,
+            lambda: self._build_page(event_id, top_n, offset, cursor),
+            cursor,
+        )
+        rows = cached["rows"]
+        has_next = cached["has_next"]
+        page = {
+            "top": rows,
+            "next_offset": offset + len(rows) if has_next else None,
+            "next_after": _rating_cursor(rows[-1]) if has_next else None,
+        }
+        if current_user_id is None:
+            return page, None, None
+
+        order_desc = cached["order_desc"]
+        prize_map = {int(place): rewards for place, rewards in cached["prizes"].items()}
+        me, around_rows = await self._personal_rows(event_id, current_user_id, around_me, order_desc)
+
+        user_ids = {uid for _place, uid, _res in around_rows or []}
+        if me is not None:
+            user_ids.add(current_user_id)
+        id_to_phone = await self._load_phones(user_ids)
 
+        cur_out: Optional[dict] = None
+        if me is not None:
+            place, res = me
+            cur_out = _leaderboard_entry(place, current_user_id, res, prize_map, id_to_phone)
+        around_out = (
+            [_leaderboard_entry(*row, prize_map, id_to_phone) for row in around_rows]
+            if around_rows is not None
+            else None
+        )
+        return page, cur_out, around_out
+
+    async def _build_page(
+        self,
+        event_id: int,
+        top_n: int,
+        offset: int,
+        after: tuple[int, float, int] | None = None,
+    ) -> dict:
+        """Общая часть ответа (кэшируется): страница + стратегия + карта призов."""
         ev = await self.session.scalar(select(EventModel).where(EventModel.id == event_id))
         if not ev:
             raise HTTPException(status_code=404, detail="Event not found")
 
+        prize_map = await self._load_prizes_map(event_id)
         order_desc = COMPARE_STRATEGY.get(ev.event_type, "higher") == "higher"
 
-        rows = (
+        # +1 строка — признак, что есть следующая страница
+        page_rows = await self._page_from_redis(ev, top_n + 1, offset, order_desc, after)
+        if page_rows is None:
+            page_rows = await self._page_from_db(event_id, top_n + 1, offset, order_desc, after)
+        has_next = len(page_rows) > top_n
+        page_rows = page_rows[:top_n]
+
+        # телефоны только для тех, кого реально отдаём
+        id_to_phone = await self._load_phones({uid for _place, uid, _res in page_rows})
+        return {
+            "order_desc": order_desc,
+            "prizes": prize_map,
+            "rows": [_leaderboard_entry(*row, prize_map, id_to_phone) for row in page_rows],
+            "has_next": has_next,
+        }
+
+    async def _page_from_redis(
+        self,
+        ev: EventModel,
+        top_n: int,
+        offset: int,
+        order_desc: bool,
+        after: tuple[int, float, int] | None = None,
+    ) -> Optional[list[tuple[int, int, float]]]:
+        """Страница из sorted set по рангу; ``None`` — Redis недоступен или прогревается.
+
+        С курсором ранг начала — позиция ключа курсора в наборе, а не ``offset``.
+        """
+        ready = await RedisLeaderboard.is_ready(ev.id)
+        if ready is None:
+            # Redis лежит — полный проход по event_ratings ради прогрева не нужен
+            return None
+        if not ready:
+            async def load_rows():
+                return (
+                    await self.session.execute(
+                        select(EventRatingModel.user_id, EventRatingModel.result)
+                        .where(EventRatingModel.event_id == ev.id)
+                    )
+                ).all()
+
+            if not await RedisLeaderboard.warm(ev.id, load_rows, ev.end_date, order_desc):
+                return None
+
+        start = offset
+        if after is not None:
+            _place, result, user_id = after
+            start = await RedisLeaderboard.rows_through(ev.id, result, user_id, order_desc)
+            if start is None:
+                return None
+        page = await RedisLeaderboard.top(ev.id, top_n, order_desc, start)
+        if page is None:
+            return None
+        return [(offset + idx, uid, res) for idx, (uid, res) in enumerate(page, start=1)]
+
+    async def _page_from_db(
+        self,
+        event_id: int,
+        top_n: int,
+        offset: int,
+        order_desc: bool,
+        after: tuple[int, float, int] | None = None,
+    ) -> list[tuple[int, int, float]]:
+        """Фолбэк на Postgres по индексу (event_id, result).
+
+        С курсором ``after`` — keyset: строки после него с LIMIT, O(top_n) на
+        любой глубине; места считаются от места курсора (это и есть ``offset``).
+        Без курсора (первая страница или прыжок на произвольный offset) —
+        OFFSET/LIMIT.
+        """
+        query = (
+            select(EventRatingModel.user_id, EventRatingModel.result)
+            .where(EventRatingModel.event_id == event_id)
+            .order_by(*_rating_order(order_desc))
+            .limit(top_n)
+        )
+        if after is not None:
+            _place, result, user_id = after
+            _ahead, behind = _neighbours(result, user_id, order_desc)
+            query = query.where(behind)
+        elif offset:
+            query = query.offset(offset)
+        rows = (await self.session.execute(query)).all()
+        return [(offset + idx, uid, float(res)) for idx, (uid, res) in enumerate(rows, start=1)]
+
+    async def _personal_rows(
+        self,
+        event_id: int,
+        user_id: int,
+        around_me: int | None,
+        order_desc: bool,
+    ) -> tuple[Optional[tuple[int, float]], Optional[list[tuple[int, int, float]]]]:
+        """(place, result) игрока и окно соседей: Redis-ранг, иначе индексные запросы."""
+        if await RedisLeaderboard.is_ready(event_id):
+            me = await RedisLeaderboard.rank(event_id, user_id, order_desc)
+            if me is not None:
+                if not around_me:
+                    return me, None
+                start = max(me[0] - 1 - around_me, 0)
+                window = await RedisLeaderboard.top(event_id, me[0] - start + around_me, order_desc, start)
+                if window is not None:
+                    return me, [(start + idx, uid, res) for idx, (uid, res) in enumerate(window, start=1)]
+            # игрока нет в наборе либо Redis ответил ошибкой — уточняем по БД
+
+        my_result = await self.session.scalar(
+            select(EventRatingModel.result).where(
+                EventRatingModel.event_id == event_id,
+                EventRatingModel.user_id == user_id,
+            )
+        )
+        if my_result is None:
+            return None, None
+        place = await self._place_of(event_id, user_id, my_result, order_desc)
+        around_rows = None
+        if around_me:
+            around_rows = await self._window_from_db(
+                event_id, user_id, my_result, place, around_me, order_desc
+            )
+        return (place, float(my_result)), around_rows
+
+    async def _window_from_db(
+        self,
+        event_id: int,
+        user_id: int,
+        result: float,
+        place: int,
+        k: int,
+        order_desc: bool,
+    ) -> list[tuple[int, int, float]]:
+        """До ``k`` соседей сверху и снизу: два keyset-запроса с LIMIT, без OFFSET."""
+        res_col, uid_col = EventRatingModel.result, EventRatingModel.user_id
+        ahead, behind = _neighbours(result, user_id, order_desc)
+        ahead_order = (res_col.asc() if order_desc else res_col.desc(), uid_col.desc())
+
+        above = (
             await self.session.execute(
-                select(
-                    EventRatingModel.user_id,
-                    EventRatingModel.result,
-                )
-                .where(EventRatingModel.event_id == event_id)
-                .order_by(EventRatingModel.result.desc() if order_desc else EventRatingModel.result.asc())
+                select(uid_col, res_col)
+                .where(EventRatingModel.event_id == event_id, ahead)
+                .order_by(*ahead_order)
+                .limit(k)
+            )
+        ).all()
+        below = (
+            await self.session.execute(
+                select(uid_col, res_col)
+                .where(EventRatingModel.event_id == event_id, behind)
+                .order_by(*_rating_order(order_desc))
+                .limit(k)
             )
         ).all()
 
-        all_results = [{"user_id": r[0], "result": r[1]} for r in rows]
+        window = [(uid, float(res)) for uid, res in reversed(above)]
+        window.append((user_id, float(result)))
+        window.extend((uid, float(res)) for uid, res in below)
+        first_place = place - len(above)
+        return [(first_place + idx, uid, res) for idx, (uid, res) in enumerate(window)]
 
-        # подтягиваем телефоны разом
-        user_ids = [r["user_id"] for r in all_results]
-        id_to_phone: Dict[int, Optional[str]] = {}
-        if user_ids:
-            rows_ph = (
-                await self.session.execute(
-                    select(UserModel.id, UserModel.phone).where(UserModel.id.in_(user_ids))
-                )
-            ).all()
-            id_to_phone = {rid: ph for rid, ph in rows_ph}
-
-        # сортировка по стратегии
-        sorted_rows = sorted(all_results, key=lambda r: r["result"], reverse=order_desc)
-
-        # top-N как список dict’ов
-        top_out: List[dict] = []
-        for idx, row in enumerate(sorted_rows[:top_n], start=1):
-            phone = id_to_phone.get(row["user_id"])
-            masked = LeaderboardEntry._mask(phone) if phone else None
-            top_out.append(
-                {
-                    "user_id": row["user_id"],
-                    "result": float(row["result"]),
-                    "place": idx,
-                    "rewards": _prepare_rewards(prize_map.get(idx)),
-                    "user_name": masked,
-                }
+    async def _place_of(
+        self,
+        event_id: int,
+        user_id: int,
+        result: float,
+        order_desc: bool,
+    ) -> int:
+        """Место игрока без выборки всей таблицы.
+
+        Считаем тех, у кого результат лучше, плюс игроков с таким же результатом
+        и меньшим user_id — тот же порядок, что и в ``_rating_order``.
+        """
+        better = EventRatingModel.result > result if order_desc else EventRatingModel.result < result
+        ahead = (
+            select(func.count())
+            .select_from(EventRatingModel)
+            .where(EventRatingModel.event_id == event_id, better)
+            .scalar_subquery()
+        )
+        tied_ahead = (
+            select(func.count())
+            .select_from(EventRatingModel)
+            .where(
+                EventRatingModel.event_id == event_id,
+                EventRatingModel.result == result,
+                EventRatingModel.user_id < user_id,
             )
+            .scalar_subquery()
+        )
+        place = await self.session.scalar(select(ahead + tied_ahead + 1))
+        return int(place)
 
-        # позиция текущего игрока — тоже dict
-        cur_out: Optional[dict] = None
-        if current_user_id is not None:
-            try:
-                user_pos = next(i for i, r in enumerate(sorted_rows) if r["user_id"] == current_user_id)
-            except StopIteration:
-                cur_out = None
-            else:
-                phone = id_to_phone.get(current_user_id)
-                masked_me = LeaderboardEntry._mask(phone) if phone else None
-                cur_out = {
-                    "user_id": current_user_id,
-                    "result": float(sorted_rows[user_pos]["result"]),
-                    "place": user_pos + 1,
-                    "rewards": _prepare_rewards(prize_map.get(user_pos + 1)),
-                    "user_name": masked_me,
-                }
-
-        return top_out, cur_out
+    async def _load_phones(self, user_ids) -> Dict[int, Optional[str]]:
+        if not user_ids:
+            return {}
+        rows_ph = (
+            await self.session.execute(
+                select(UserModel.id, UserModel.phone).where(UserModel.id.in_(list(user_ids)))
+            )
+        ).all()
+        return {rid: ph for rid, ph in rows_ph}
 
     # ------------------------------------------------------------------
     #  АРХИВАЦИЯ ОДНОГО СОБЫТИЯ
     # ------------------------------------------------------------------
     async def archive_event_results(self, event_id: int) -> None:
+        """Переносит результаты ивента в архив и призы.
+
+        Ничего не коммитит: вызывающий (``EventArchiver``) выполняет всё в одной
+        транзакции под advisory-локом и сам сбрасывает Redis-лидерборд.
+        """
         ev = await self.session.scalar(select(EventModel).where(EventModel.id == event_id))
         if not ev:
             return
 
-        # 1. Собираем весь лидерборд
-        rows = (
-            await self.session.execute(
-                select(
-                    EventRatingModel.user_id,
-                    EventRatingModel.result,
-                ).where(EventRatingModel.event_id == event_id)
-            )
-        ).all()
-
         order_desc = COMPARE_STRATEGY.get(ev.event_type, "higher") == "higher"
-        sorted_rows = sorted(rows, key=lambda r: r[1], reverse=order_desc)
-
         prize_map = await self._load_prizes_map(event_id)
 
-        payload = []
-        for idx, (uid, res) in enumerate(sorted_rows, start=1):
-            payload.append(
-                {
-                    "user_id": uid,
-                    "result": float(res),
-                    "place": idx,
-                    "rewards": _prepare_rewards(prize_map.get(idx)),
-                }
-            )
+        # 1. Стримим лидерборд курсором в порядке мест: полный — в zip,
+        #    в памяти только призовые места
+        archives_dir = Path("/app/archives")
+        archives_dir.mkdir(parents=True, exist_ok=True)
+        writer = await asyncio.to_thread(JsonArrayZip, archives_dir / f"event_{event_id}.zip")
 
-        # 2. Сохраняем в архив
+        winners: list[dict] = []
+        try:
+            stream = await self.session.stream(
+                select(EventRatingModel.user_id, EventRatingModel.result)
+                .where(EventRatingModel.event_id == event_id)
+                .order_by(*_rating_order(order_desc))
+                .execution_options(yield_per=EVENT_ARCHIVE_BATCH)
+            )
+            place = 0
+            async for partition in stream.partitions():
+                batch = []
+                for uid, res in partition:
+                    place += 1
+                    row = {
+                        "user_id": uid,
+                        "result": float(res),
+                        "place": place,
+                        "rewards": _prepare_rewards(prize_map.get(place)),
+                    }
+                    batch.append(row)
+                    if row["rewards"]:
+                        winners.append(row)
+                await asyncio.to_thread(writer.write, batch)
+            await asyncio.to_thread(writer.commit)
+        except BaseException:
+            await asyncio.to_thread(writer.abort)
+            raise
+
+        # 2. В истории — только призовые места (их читает список ивентов),
+        #    полный лидерборд лежит в zip
         hist = EventHistoryModel(
             event_id=event_id,
             ended_at=datetime.now(timezone.utc),
-            results=payload,
+            results=winners,
         )
         self.session.add(hist)
-        await self.session.commit()
-
-        # zip с leaderbord.json (опционально)
-        archives_dir = Path("/app/archives")
-        archives_dir.mkdir(parents=True, exist_ok=True)
-        zip_path = archives_dir / f"event_{event_id}.zip"
-        with zipfile.ZipFile(zip_path, "w") as zf:
-            zf.writestr("leaderboard.json", json.dumps(payload, ensure_ascii=False))
 
         # 3. Непретензованные призы
-        await self.prizes_core.add_unclaimed_prizes_from_archive(event_id, payload)
+        await self.prizes_core.add_unclaimed_prizes_from_archive(event_id, winners)
 
         # 4. Чистим активные результаты
         await self.session.execute(
             delete(EventRatingModel).where(EventRatingModel.event_id == event_id)
         )
-        await self.session.commit()
 
     # ------------------------------------------------------------------
     #  ВНУТРЕННЕЕ: телефоны победителей по местам из архива
     # ------------------------------------------------------------------
     async def _load_winner_phones(self, event_id: int) -> Dict[int, str]:
         """Возвращает {place: phone} для последнего архива этого события."""
-        hist = await self.session.scalar(
-            select(EventHistoryModel)
-            .where(EventHistoryModel.event_id == event_id)
-            .order_by(desc(EventHistoryModel.ended_at))
-        )
-        if not hist or not hist.results:
+        return (await self._load_winner_phones_bulk([event_id])).get(event_id, {})
+
+    async def _load_winner_phones_bulk(self, event_ids: List[int]) -> Dict[int, Dict[int, str]]:
+        """{event_id: {place: phone}} по последнему архиву каждого события."""
+        if not event_ids:
             return {}
 
-        # place -> user_id (берём первый встретившийся)
-        place_to_user: Dict[int, int] = {}
-        for row in hist.results:
-            try:
-                place = int(row.get("place"))
-                uid = int(row.get("user_id"))
-            except Exception:
-                continue
-            place_to_user.setdefault(place, uid)
+        hist_rows = (
+            await self.session.execute(
+                select(EventHistoryModel.event_id, EventHistoryModel.results)
+                .where(EventHistoryModel.event_id.in_(event_ids))
+                .distinct(EventHistoryModel.event_id)
+                .order_by(EventHistoryModel.event_id, desc(EventHistoryModel.ended_at))
+            )
+        ).all()
 
-        if not place_to_user:
-            return {}
+        # event_id -> place -> user_id (берём первый встретившийся)
+        place_to_user: Dict[int, Dict[int, int]] = {}
+        for event_id, results in hist_rows:
+            places: Dict[int, int] = {}
+            for row in results or []:
+                try:
+                    place = int(row.get("place"))
+                    uid = int(row.get("user_id"))
+                except Exception:
+                    continue
+                places.setdefault(place, uid)
+            if places:
+                place_to_user[event_id] = places
 
-        user_ids = list({uid for uid in place_to_user.values() if isinstance(uid, int)})
+        user_ids = list({uid for places in place_to_user.values() for uid in places.values()})
         if not user_ids:
             return {}
 
@@ -405,11 +699,11 @@ class EventRatingCore:
                 select(UserModel.id, UserModel.phone).where(UserModel.id.in_(user_ids))
             )
         ).all()
-
         id_to_phone = {rid: ph for rid, ph in rows if ph}
-        phones_by_place: Dict[int, str] = {}
-        for place, uid in place_to_user.items():
-            ph = id_to_phone.get(uid)
-            if ph:
-                phones_by_place[place] = ph
-        return phones_by_place
+
+        phones: Dict[int, Dict[int, str]] = {}
+        for event_id, places in place_to_user.items():
+            phones[event_id] = {
+                place: id_to_phone[uid] for place, uid in places.items() if uid in id_to_phone
+            }
+        return phones
@@ -0,0 +1,157 @@
+"""Микробенчмарк сериализации ответов: прежний путь против orjson-слоя.
+
+Запуск (без БД и Redis, данные синтетические)::
+
+    python -m src.infra.bench_serialization
+    python -m src.infra.bench_serialization --rows 100 --number 2000
+
+«Было» повторяет то, что делал FastAPI/хендлер до перехода на orjson:
+``model_dump`` → ``jsonable_encoder`` → ``JSONResponse`` для профиля,
+валидация и дамп через ``response_model`` → ``JSONResponse`` для лидерборда,
+``jsonable_encoder`` → ``JSONResponse`` для призов, ``json.dumps`` для
+снапшота ивентов. «Стало» — хелперы из ``src.infra.responses`` и ``dump_json``.
+"""
+
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from src.events.DTO import EventPublicDTO, LeaderboardResponse
+from src.infra.responses import model_json, trusted_json
+from src.infra.snapshot import dump_json
+from src.schemas.users import UserSchemaWithoutOrm
+
+
+def _user() -> UserSchemaWithoutOrm:
+    now = datetime.now(timezone.utc)
+    return UserSchemaWithoutOrm(
+        id=1,
+        phone="79990001122",
+        coins=12_345,
+        skin="default",
+        common_seed=10,
+        epic_seed=2,
+        rare_seed=5,
+        water=40,
+        level=17,
+        booster="0,1,0",
+        item="1,2,3",
+        pot="0,0,1",
+        created_at=now - timedelta(days=30),
+        last_update=now,
+    )
+
+
+def _entry(place: int) -> dict:
+    return {
+        "user_id": 1000 + place,
+        "result": round(random.uniform(0, 10_000), 2),
+        "place": place,
+        "rewards": {"coins": 500, "skin": "gold"} if place <= 3 else None,
+        "user_name": f"+7999***{place:04d}",
+    }
+
+
+def _leaderboard(rows: int) -> dict:
+    me = _entry(rows + 50)
+    return {
+        "top": [_entry(place) for place in range(1, rows + 1)],
+        "current_user": {key: me[key] for key in ("user_id", "result", "place", "rewards")},
+        "around": [_entry(place) for place in range(rows + 45, rows + 56)],
+        "next_offset": rows,
+    }
+
+
+def _prizes(rows: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "reward_id": n,
+            "event_id": n % 7,
+            "place": n % 10 + 1,
+            "rewards": {"coins": 100 * n, "water": 5},
+            "created": now - timedelta(hours=n),
+        }
+        for n in range(rows)
+    ]
+
+
+def _events(count: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    events = [
+        EventPublicDTO(
+            id=n,
+            name=f"Event {n}",
+            event_type="score",
+            logo="logo.png",
+            start_date=now,
+            end_date=now + timedelta(days=1),
+            level_id=list(range(10)),
+            prizes=[{"place": p, "rewards": {"coins": 1000 // p}} for p in range(1, 11)],
+        )
+        for n in range(count)
+    ]
+    return [ev.model_dump(mode="json", by_alias=True, exclude_none=True) for ev in events]
+
+
+def _cases(rows: int) -> list[tuple[str, Callable[[], Any], Callable[[], Any]]]:
+    user = _user()
+    leaderboard = _leaderboard(rows)
+    leaderboard_adapter = TypeAdapter(LeaderboardResponse)
+    prizes = _prizes(rows)
+    events = _events(5)
+
+    def leaderboard_before() -> bytes:
+        # то, что делает FastAPI для dict при response_model
+        value = leaderboard_adapter.validate_python(leaderboard)
+        return JSONResponse(leaderboard_adapter.dump_python(value, mode="json")).body
+
+    return [
+        (
+            "user profile",
+            lambda: JSONResponse(jsonable_encoder(user.model_dump(mode="json"))).body,
+            lambda: model_json(user).body,
+        ),
+        (
+            f"leaderboard ({rows} rows)",
+            leaderboard_before,
+            lambda: trusted_json(leaderboard).body,
+        ),
+        (
+            f"unclaimed prizes ({rows} rows)",
+            lambda: JSONResponse(jsonable_encoder(prizes)).body,
+            lambda: trusted_json(prizes).body,
+        ),
+        (
+            "events listing snapshot",
+            lambda: json.dumps(events, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+            lambda: dump_json(events),
+        ),
+    ]
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f"{'case':<32} {'before, µs':>12} {'after, µs':>12} {'speedup':>9}")
+    for name, before, after in _cases(args.rows):
+        before_us = min(timeit.repeat(before, number=args.number, repeat=args.repeat)) / args.number * 1e6
+        after_us = min(timeit.repeat(after, number=args.number, repeat=args.repeat)) / args.number * 1e6
+        print(f"{name:<32} {before_us:>12.1f} {after_us:>12.1f} {before_us / after_us:>8.1f}x")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare per-request JSON serialization cost.")
+    parser.add_argument("--rows", type=int, default=100, help="строк в лидерборде и списке призов")
+    parser.add_argument("--number", type=int, default=1000, help="вызовов в одном замере")
+    parser.add_argument("--repeat", type=int, default=5, help="замеров; берётся лучший")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main(_parse_args())
@@ -0,0 +1,55 @@
+"""Общий keep-alive HTTP-клиент для партнёрского API билайна.
+
+Один ``httpx.AsyncClient`` на воркер: пул соединений и TLS-сессии
+переиспользуются между покупками. Создаётся на старте приложения,
+закрывается на остановке.
+"""
+
+import httpx
+
+from config import (
+    BEELINE_API_URL,
+    BEELINE_HTTP2,
+    BEELINE_HTTP_CONNECT_TIMEOUT,
+    BEELINE_HTTP_KEEPALIVE_EXPIRY,
+    BEELINE_HTTP_MAX_CONNECTIONS,
+    BEELINE_HTTP_MAX_KEEPALIVE,
+    BEELINE_HTTP_TIMEOUT,
+)
+from src.infra.logger import logger
+
+
+class BeelineHttpClient:
+    _client: httpx.AsyncClient | None = None
+
+    @staticmethod
+    def _create() -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=BEELINE_API_URL,
+            http2=BEELINE_HTTP2,
+            limits=httpx.Limits(
+                max_connections=BEELINE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=BEELINE_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=BEELINE_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(BEELINE_HTTP_TIMEOUT, connect=BEELINE_HTTP_CONNECT_TIMEOUT),
+            headers={"accept": "application/json"},
+        )
+
+    @classmethod
+    def get(cls) -> httpx.AsyncClient:
+        """Клиент воркера; создаётся лениво, если startup не вызывался (скрипты)."""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = cls._create()
+        return cls._client
+
+    @classmethod
+    async def startup(cls) -> None:
+        cls.get()
+        logger.info(f"HTTP-клиент билайна готов: {BEELINE_API_URL}, http2={BEELINE_HTTP2}")
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
@@ -0,0 +1,77 @@
+"""Кэш токенов партнёрского API билайна по номеру телефона.
+
+Два уровня: in-process LRU (без сетевых походов) и общий Redis, чтобы токен,
+полученный одним воркером, переиспользовали остальные. Срок жизни берётся из
+ответа партнёра, а если его там нет — из ``BEELINE_TOKEN_TTL``.
+"""
+
+import time
+from collections import OrderedDict
+
+from redis.exceptions import RedisError
+
+from config import BEELINE_TOKEN_CACHE_SIZE
+from src.infra.logger import logger
+from src.infra.radis import redis_client
+
+# Запас, чтобы не отправить токен, который истечёт по дороге к партнёру
+_EXPIRY_MARGIN = 15.0
+
+
+class PartnerTokenCache:
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._local: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    @staticmethod
+    def _key(phone: str) -> str:
+        return f"beeline_token:{phone}"
+
+    async def get(self, phone: str) -> str | None:
+        entry = self._local.get(phone)
+        if entry is not None:
+            deadline, token = entry
+            if time.monotonic() < deadline:
+                self._local.move_to_end(phone)
+                return token
+            del self._local[phone]
+
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(self._key(phone))
+                pipe.pttl(self._key(phone))
+                token, ttl_ms = await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"[BEELINE_TOKEN] Redis недоступен: {exc}")
+            return None
+        if not token or ttl_ms is None or ttl_ms <= 0:
+            return None
+        self._remember(phone, token, ttl_ms / 1000)
+        return token
+
+    async def set(self, phone: str, token: str, lifetime: float) -> None:
+        ttl = lifetime - _EXPIRY_MARGIN
+        if ttl <= 0:
+            return
+        self._remember(phone, token, ttl)
+        try:
+            await redis_client.set(self._key(phone), token, px=int(ttl * 1000))
+        except RedisError as exc:
+            logger.warning(f"[BEELINE_TOKEN] Не удалось сохранить токен в Redis: {exc}")
+
+    async def invalidate(self, phone: str) -> None:
+        self._local.pop(phone, None)
+        try:
+            await redis_client.delete(self._key(phone))
+        except RedisError as exc:
+            logger.warning(f"[BEELINE_TOKEN] Не удалось удалить токен из Redis: {exc}")
+
+    def _remember(self, phone: str, token: str, ttl: float) -> None:
+        self._local[phone] = (time.monotonic() + ttl, token)
+        self._local.move_to_end(phone)
+        while len(self._local) > self._maxsize:
+            self._local.popitem(last=False)
+
+
+partner_token_cache = PartnerTokenCache(maxsize=BEELINE_TOKEN_CACHE_SIZE)
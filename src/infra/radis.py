@@ -1,18 +1,81 @@
-import redis
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
 
+from config import (
+    REDIS_DB,
+    REDIS_HOST,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_PORT,
+    REDIS_WAIT_MAX_CONNECTIONS,
+)
 from src.infra.logger import logger
 
-redis_client = redis.StrictRedis(host='redis', port=6379, db=0, decode_responses=True)
+# Общий пул соединений воркера; при исчерпании ждём свободное соединение, а не падаем
+redis_pool = redis.BlockingConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    decode_responses=True,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
+)
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+# Отдельный пул для блокирующих ожиданий (BLPOP статуса покупки): соединение
+# занято до PURCHASE_STATUS_TIMEOUT, и всплеск покупок не должен выбрать общий
+# пул, через который ходят токены, лидерборд, каталог и очередь платежей
+redis_wait_pool = redis.BlockingConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    db=REDIS_DB,
+    decode_responses=True,
+    max_connections=REDIS_WAIT_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
+)
+redis_wait_client = redis.Redis(connection_pool=redis_wait_pool)
+
+# Сколько храним статус покупки, если его никто не дождался
+_PURCHASE_STATUS_TTL = 600
+
+
+async def close_redis() -> None:
+    await redis_client.aclose()
+    await redis_pool.disconnect()
+    await redis_wait_client.aclose()
+    await redis_wait_pool.disconnect()
 
 
 class Redis:
 
     @staticmethod
-    def add_status_purchase(phone: str, status: str):
-        logger.info(f'добавил в редис {phone}, {status}')
-        redis_client.set(phone, status, ex=600)
+    def _purchase_key(purchase_id: str) -> str:
+        return f"purchase_status:{purchase_id}"
 
     @staticmethod
-    def get_status_purchase(phone):
-        logger.info(f'взял из редис {phone}, {redis_client.get(phone)}')
-        return redis_client.get(phone)
+    async def add_status_purchase(purchase_id: str, status: str):
+        """Колбэк билайна кладёт статус в список — ожидающий buy_product просыпается сразу."""
+        logger.info(f'добавил в редис {purchase_id}, {status}')
+        key = Redis._purchase_key(purchase_id)
+        async with redis_client.pipeline() as pipe:
+            pipe.rpush(key, status)
+            pipe.expire(key, _PURCHASE_STATUS_TTL)
+            await pipe.execute()
+
+    @staticmethod
+    async def wait_status_purchase(purchase_id: str, timeout: float) -> str | None:
+        """Ждёт статус покупки до ``timeout`` секунд (BLPOP), ``None`` — не дождались.
+
+        Если колбэк пришёл раньше, чем мы начали ждать, статус уже лежит в списке.
+        Ждём на отдельном пуле ``redis_wait_pool``; если все его соединения
+        заняты ожиданиями, один раз забираем статус без блокировки из общего.
+        """
+        key = Redis._purchase_key(purchase_id)
+        try:
+            item = await redis_wait_client.blpop([key], timeout=timeout)
+            status = item[1] if item else None
+        except RedisConnectionError as exc:
+            logger.warning(f"[REDIS] Нет соединения для ожидания {purchase_id}: {exc}")
+            status = await redis_client.lpop(key)
+        logger.info(f'взял из редис {purchase_id}, {status}')
+        return status
@@ -0,0 +1,52 @@
+"""Быстрые JSON-ответы на orjson.
+
+``ORJSONResponse`` — класс ответа по умолчанию для всего приложения (main.py).
+Для данных, которые мы собрали сами и которым доверяем (профиль из ORM,
+страницы лидерборда, призы), хендлеры отдают ответ напрямую через хелперы
+ниже: без повторной валидации ``response_model`` и без ``jsonable_encoder``.
+``response_model`` на таких роутах остаётся только ради OpenAPI.
+
+NaN/Infinity orjson пишет как ``null``, тогда как прежний
+``json.dumps(allow_nan=False)`` падал с ``ValueError`` (ответ 500). Поштучная
+проверка ответа стоит в разы дороже самого orjson, поэтому на пути запроса её
+нет: нечисловые значения не пускаются на входе (``POST /api/event/result``), а
+снапшоты, которые собираются раз на версию, проверяет ``ensure_finite``.
+"""
+
+import math
+from typing import Any, Mapping
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def ensure_finite(value: Any) -> None:
+    """Как ``json.dumps(allow_nan=False)``: NaN/Infinity — ошибка, а не ``null``."""
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+    elif isinstance(value, dict):
+        for item in value.values():
+            ensure_finite(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            ensure_finite(item)
+
+
+def trusted_json(
+    content: Any,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> ORJSONResponse:
+    """Готовые dict/list (datetime допустим) → JSON за один проход orjson."""
+    return ORJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def model_json(model: BaseModel, status_code: int = 200, **dump_options: Any) -> Response:
+    """Pydantic-модель → JSON сериализатором pydantic-core, без промежуточного dict."""
+    return Response(
+        content=model.model_dump_json(**dump_options),
+        status_code=status_code,
+        media_type="application/json",
+    )
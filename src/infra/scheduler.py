@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from config import EVENT_ARCHIVE_INTERVAL
+from src.events.archiver import EventArchiver
+
+# Один планировщик на воркер; задачи, которые должны выполниться ровно
+# один раз на кластер, защищаются advisory-локами в самой задаче.
+scheduler = AsyncIOScheduler(timezone=timezone.utc)
+
+
+def start_scheduler() -> None:
+    scheduler.add_job(
+        EventArchiver.run_once,
+        "interval",
+        seconds=EVENT_ARCHIVE_INTERVAL,
+        id="archive_expired_events",
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(timezone.utc),
+        replace_existing=True,
+    )
+    scheduler.start()
+
+
+def stop_scheduler() -> None:
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
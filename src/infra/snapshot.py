@@ -0,0 +1,47 @@
+"""Предсериализованные снапшоты ответов с ETag.
+
+Снапшот хранит готовые JSON-байты, их ETag, версию источника и момент,
+после которого его надо пересобрать. Отдаётся как есть или как 304.
+"""
+
+import hashlib
+import math
+import time
+from typing import Any
+
+import orjson
+from starlette.responses import Response
+
+from src.infra.responses import ensure_finite
+
+
+def dump_json(payload: Any) -> bytes:
+    """Сериализация как у ORJSONResponse (utf-8, без пробелов), NaN/Infinity — ошибка."""
+    ensure_finite(payload)
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+
+
+class Snapshot:
+    __slots__ = ("body", "etag", "version", "expires_at")
+
+    def __init__(self, body: bytes, version: str | None, ttl: float = math.inf) -> None:
+        self.body = body
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.version = version
+        self.expires_at = time.monotonic() + ttl
+
+    def is_fresh(self, version: str | None) -> bool:
+        """Та же версия источника и TTL не истёк."""
+        return self.version == version and time.monotonic() < self.expires_at
+
+    def matches(self, if_none_match: str | None) -> bool:
+        if not if_none_match:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or self.etag in candidates
+
+    def response(self, if_none_match: str | None = None) -> Response:
+        headers = {"ETag": self.etag, "Cache-Control": "no-cache"}
+        if self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
@@ -0,0 +1,160 @@
+"""In-process LRU+TTL кэш провалидированных access-токенов.
+
+Хранит не объекты из сессии запроса, а их transient-копии: ``TokenModel`` и
+``UserModel`` со скопированными колонками, не привязанные ни к одной сессии.
+Общая запись читается конкурентными запросами, поэтому ни откат, ни изменения
+в чужой сессии её не затрагивают, а обращение к атрибутам никогда не идёт в БД.
+Копии — только для чтения. Запись живёт не дольше ``TOKEN_CACHE_TTL`` и не
+дольше ``expires_at`` самого токена. Инвалидация — локально и через Redis
+pub/sub во всех воркерах.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+from redis.exceptions import RedisError
+from sqlalchemy import inspect
+
+from config import TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL
+from src.database.models import TokenModel, UserModel
+from src.infra.create_time import Time
+from src.infra.logger import logger
+from src.infra.radis import redis_client
+
+INVALIDATION_CHANNEL = "token_cache:invalidate"
+
+
+def _columns(record, model) -> dict:
+    return {attr.key: getattr(record, attr.key) for attr in inspect(model).column_attrs}
+
+
+def _detached_copy(record: TokenModel) -> TokenModel:
+    """Transient-копия токена и его пользователя (колонки уже загружены)."""
+    token = TokenModel(**_columns(record, TokenModel))
+    token.user = UserModel(**_columns(record.user, UserModel))
+    return token
+
+
+class TokenCache:
+    """Ограниченный LRU-кэш ``token -> TokenModel`` с TTL."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, TokenModel]] = OrderedDict()
+        self._by_user: dict[int, set[str]] = {}
+        self._listener: asyncio.Task | None = None
+
+    # ------------------------------------------------------------------ #
+    # Чтение / запись
+    # ------------------------------------------------------------------ #
+
+    def get(self, token: str) -> TokenModel | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        deadline, record = entry
+        if time.monotonic() >= deadline:
+            self._pop(token)
+            return None
+        self._entries.move_to_end(token)
+        return record
+
+    def set(self, record: TokenModel) -> None:
+        if self._maxsize <= 0 or self._ttl <= 0:
+            return
+        seconds_left = (record.expires_at - Time.now()).total_seconds()
+        if seconds_left <= 0:
+            return
+        deadline = time.monotonic() + min(self._ttl, seconds_left)
+        record = _detached_copy(record)
+
+        self._pop(record.token)
+        self._entries[record.token] = (deadline, record)
+        self._by_user.setdefault(record.id_user, set()).add(record.token)
+        while len(self._entries) > self._maxsize:
+            oldest = next(iter(self._entries))
+            self._pop(oldest)
+
+    def _pop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[1].id_user
+        tokens = self._by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[user_id]
+
+    # ------------------------------------------------------------------ #
+    # Инвалидация
+    # ------------------------------------------------------------------ #
+
+    def evict(self, token: str) -> None:
+        self._pop(token)
+
+    def evict_user(self, user_id: int) -> None:
+        for token in list(self._by_user.get(user_id, ())):
+            self._pop(token)
+
+    async def invalidate(self, token: str) -> None:
+        """Сбросить токен в этом воркере и разослать остальным."""
+        self.evict(token)
+        await self._publish(f"token:{token}")
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Сбросить все токены пользователя (смена токена, изменение профиля)."""
+        self.evict_user(user_id)
+        await self._publish(f"user:{user_id}")
+
+    @staticmethod
+    async def _publish(message: str) -> None:
+        try:
+            await redis_client.publish(INVALIDATION_CHANNEL, message)
+        except RedisError as exc:
+            # остальные воркеры догонят по TTL
+            logger.warning(f"[TOKEN_CACHE] Не удалось разослать инвалидацию: {exc}")
+
+    def _on_message(self, message: dict) -> None:
+        kind, _, value = str(message.get("data", "")).partition(":")
+        if kind == "token":
+            self.evict(value)
+        elif kind == "user" and value.isdigit():
+            self.evict_user(int(value))
+
+    # ------------------------------------------------------------------ #
+    # Подписка на инвалидации других воркеров
+    # ------------------------------------------------------------------ #
+
+    def start_listener(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    self._on_message(message)
+            except RedisError as exc:
+                # пока подписки нет, записи протухают по TTL
+                logger.warning(f"[TOKEN_CACHE] Ошибка pub/sub, переподключаюсь: {exc}")
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
+
+
+token_cache = TokenCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
@@ -5,6 +5,7 @@ from sqlalchemy import (
     Integer,
     ForeignKey,
     DateTime,
+    Index,
     JSON,
     UniqueConstraint,
 )
@@ -15,7 +16,10 @@ from src.database.connection import Base  # единая metadata для Alembic
 class UnclaimedRewardModel(Base):
     __tablename__ = "unclaimed_rewards"
     __table_args__ = (
+        # выборки по user_id покрывает левый префикс уникального ключа
         UniqueConstraint("user_id", "event_id", name="uq_reward_user_event"),
+        # перевыдача призов при архивации удаляет по event_id
+        Index("ix_unclaimed_rewards_event", "event_id"),
     )
 
     id = Column(Integer, primary_key=True)
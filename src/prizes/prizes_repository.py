@@ -1,8 +1,11 @@
-from typing import List, Optional, Sequence
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
 
-from sqlalchemy import select, delete, insert
+from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.database.bulk import copy_records, json_value
+from src.database.routing import ReadRouting
 from src.prizes.models import UnclaimedRewardModel
 
 
@@ -16,33 +19,30 @@ class PrizesCore:
     async def add_unclaimed_prizes_from_archive(
         self,
         event_id: int,
-        result_data: Sequence[dict],
+        result_data: Iterable[dict],
     ) -> None:
         """
         1. Удаляет старые записи данного event_id
         2. Добавляет новые (только если rewards не пустой dict/список)
+        Коммит — на стороне вызывающего (архивация идёт одной транзакцией).
         """
         # 1) чистим предыдущий импорт
         await self.session.execute(
             delete(UnclaimedRewardModel).where(UnclaimedRewardModel.event_id == event_id)
         )
 
-        # 2) формируем список строк для массовой вставки
-        rows = [
-            {
-                "user_id": row["user_id"],
-                "event_id": event_id,
-                "place": row["place"],
-                "rewards": row["rewards"],
-            }
-            for row in result_data
-            if row.get("rewards")  # пропускаем, если призов нет
-        ]
-        if rows:
-            stmt = insert(UnclaimedRewardModel).values(rows)
-            await self.session.execute(stmt)
-
-        await self.session.commit()
+        # 2) COPY вместо INSERT ... VALUES: без лимита параметров и построчного SQL
+        created_at = datetime.now(tz=timezone.utc)
+        await copy_records(
+            self.session,
+            UnclaimedRewardModel,
+            ("user_id", "event_id", "place", "rewards", "created_at"),
+            (
+                (row["user_id"], event_id, row["place"], json_value(row["rewards"]), created_at)
+                for row in result_data
+                if row.get("rewards")  # пропускаем, если призов нет
+            ),
+        )
 
     # -------------------------------------------------
     # Получить все непретензованные призы для пользователя
@@ -99,4 +99,5 @@ class PrizesCore:
 
         await self.session.delete(reward)
         await self.session.commit()
+        await ReadRouting.mark_write(user_id)
         return reward
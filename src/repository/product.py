@@ -1,7 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.database.connection import get_async_session
+from src.database.connection import get_async_session, get_read_session, in_request_scope
 from src.database.models import ProductModel
 from src.infra.logger import logger
 
@@ -10,13 +10,15 @@ class ProductRepository:
 
     @staticmethod
     async def get_all():
-        async with get_async_session() as session:
+        async with get_read_session() as session:
             try:
                 result = await session.execute(select(ProductModel))
                 return result.scalars().all()
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
 
     @staticmethod
     async def get(productId: int):
@@ -27,3 +29,5 @@ class ProductRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
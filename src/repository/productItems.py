@@ -1,7 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.database.connection import get_async_session
+from src.database.connection import get_async_session, in_request_scope
 from src.database.models import ProductItemModel
 from src.infra.logger import logger
 
@@ -17,3 +17,5 @@ class ProductItemRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
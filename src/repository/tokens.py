@@ -1,9 +1,12 @@
+from datetime import datetime
+
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
 
-from src.database.connection import get_async_session
-from src.database.models import TokenModel
+from src.database.connection import get_async_session, in_request_scope
+from src.database.models import TokenModel, UserModel
 from src.infra.logger import logger
 
 
@@ -18,6 +21,8 @@ class TokenRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
 
     @staticmethod
     async def get(accessToken: str) -> TokenModel:
@@ -32,3 +37,48 @@ class TokenRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
+
+    @staticmethod
+    async def upsert_for_phone(
+        phone: str,
+        token: str,
+        expires_at: datetime,
+    ) -> tuple[int, str, datetime] | None:
+        """get-or-create пользователя и ротация его токена в одной транзакции.
+
+        Возвращает (user_id, token, expires_at) прямо из RETURNING — без перечитывания.
+        """
+        user_insert = pg_insert(UserModel).values(phone=phone)
+        user_stmt = user_insert.on_conflict_do_update(
+            index_elements=[UserModel.phone],
+            # no-op апдейт, чтобы RETURNING вернул id и для существующего пользователя
+            set_={"phone": user_insert.excluded.phone},
+        ).returning(UserModel.id)
+
+        async with get_async_session() as session:
+            try:
+                user_id = await session.scalar(user_stmt)
+
+                token_insert = pg_insert(TokenModel).values(
+                    id_user=user_id,
+                    token=token,
+                    expires_at=expires_at,
+                )
+                token_stmt = token_insert.on_conflict_do_update(
+                    index_elements=[TokenModel.id_user],
+                    set_={
+                        "token": token_insert.excluded.token,
+                        "expires_at": token_insert.excluded.expires_at,
+                    },
+                ).returning(TokenModel.token, TokenModel.expires_at)
+                row = (await session.execute(token_stmt)).one()
+
+                await session.commit()
+                return user_id, row.token, row.expires_at
+            except SQLAlchemyError as e:
+                logger.error(e)
+                await session.rollback()
+                if in_request_scope():
+                    raise
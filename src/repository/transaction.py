@@ -1,10 +1,20 @@
-from sqlalchemy import select
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import exists, func, insert, select, tuple_, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.database.connection import get_async_session
-from src.database.models import ProductModel, TransactionModel
+from src.database.connection import get_async_session, in_request_scope
+from src.database.models import ProductModel, TransactionModel, UnaddedProduct
 from src.infra.logger import logger
 
+# Из каких статусов колбэк может перевести транзакцию в новый статус
+_PENDING_FROM = {
+    "success": ("unknown", "in_progress"),
+    "error": ("unknown", "in_progress"),
+    "in_progress": ("unknown",),
+}
+
 
 class TransactionRepository:
 
@@ -17,6 +27,8 @@ class TransactionRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
 
     @staticmethod
     async def get(purchaseId: str):
@@ -28,20 +40,110 @@ class TransactionRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
+
+    @staticmethod
+    def list_by_user_query(
+        user_id: int,
+        limit: int | None = None,
+        before: tuple[datetime, int] | None = None,
+        statuses: Sequence[str] | None = None,
+    ):
+        """Страница истории покупок, новые сверху (план проверяет explain_check).
+
+        Keyset: ``before=(created_at, id)`` последней строки прошлой страницы;
+        порядок ``(created_at DESC, id DESC)`` совпадает с ix_transactions_user_created,
+        так что страница читается из индекса без OFFSET и без сортировки.
+        Колонки — плоские, без ORM-объектов: строки сразу идут в JSON.
+        """
+        query = (
+            select(
+                TransactionModel.id,
+                TransactionModel.status,
+                TransactionModel.created_at,
+                TransactionModel.productId.label("product_id"),
+                ProductModel.name.label("product_name"),
+                ProductModel.price.label("product_price"),
+            )
+            .join(ProductModel, TransactionModel.productId == ProductModel.id, isouter=True)
+            .where(TransactionModel.id_user == user_id)
+            .order_by(TransactionModel.created_at.desc(), TransactionModel.id.desc())
+        )
+        if before is not None:
+            query = query.where(tuple_(TransactionModel.created_at, TransactionModel.id) < tuple_(*before))
+        if statuses:
+            query = query.where(TransactionModel.status.in_(statuses))
+        if limit is not None:
+            query = query.limit(limit)
+        return query
 
     @staticmethod
-    async def list_by_user(user_id: int):
+    async def list_by_user(
+        user_id: int,
+        limit: int | None = None,
+        before: tuple[datetime, int] | None = None,
+        statuses: Sequence[str] | None = None,
+    ):
         async with get_async_session() as session:
             try:
-                query = (
-                    select(TransactionModel, ProductModel)
-                    .join(ProductModel, TransactionModel.productId == ProductModel.id, isouter=True)
-                    .where(TransactionModel.id_user == user_id)
-                    .order_by(TransactionModel.created_at.desc())
+                result = await session.execute(
+                    TransactionRepository.list_by_user_query(user_id, limit, before, statuses)
                 )
-                result = await session.execute(query)
-                return result.all()
+                return result.mappings().all()
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
                 return []
+
+    @staticmethod
+    async def apply_callback_status(purchase_id: str, status: str) -> tuple[bool, int | None]:
+        """Идемпотентно применить статус из колбэка Билайна одним запросом.
+
+        Условный ``UPDATE ... WHERE status IN (<ожидающие>) RETURNING`` и
+        выдача покупки (``INSERT INTO unadded_product``) — data-modifying CTE
+        в одной транзакции: повтор или параллельный дубль колбэка не находит
+        строку для UPDATE и ничего не начисляет.
+
+        Возвращает ``(known, user_id)``: ``known`` — транзакция существует,
+        ``user_id`` — владелец, если статус применён этим вызовом, иначе ``None``.
+        """
+        claimed = (
+            update(TransactionModel)
+            .where(
+                TransactionModel.purchaseId == purchase_id,
+                TransactionModel.status.in_(_PENDING_FROM.get(status, ("unknown",))),
+            )
+            .values(status=status)
+            .returning(TransactionModel.id_user, TransactionModel.productId)
+            .cte("claimed")
+        )
+        columns = [select(claimed.c.id_user).scalar_subquery()]
+        if status == "success":
+            granted = (
+                insert(UnaddedProduct)
+                .from_select(
+                    ["id_user", "productId"],
+                    select(claimed.c.id_user, claimed.c.productId),
+                )
+                .returning(UnaddedProduct.id)
+                .cte("granted")
+            )
+            # CTE выполнится в любом случае, но сошлёмся на него явно
+            columns.append(select(func.count()).select_from(granted).scalar_subquery())
+        stmt = select(
+            exists().where(TransactionModel.purchaseId == purchase_id),
+            *columns,
+        )
+
+        async with get_async_session() as session:
+            try:
+                row = (await session.execute(stmt)).one()
+                await session.commit()
+                return bool(row[0]), row[1]
+            except SQLAlchemyError as e:
+                logger.error(e)
+                await session.rollback()
+                raise
@@ -1,10 +1,39 @@
-from sqlalchemy import select, delete
+from typing import Sequence
+
+from sqlalchemy import select, delete, update
 from sqlalchemy.exc import SQLAlchemyError
 
-from src.database.connection import get_async_session
-from src.database.models import UnaddedProduct
+from src.database.connection import get_async_session, in_request_scope
+from src.database.models import ProductItemModel, ProductModel, UnaddedProduct, UserModel
+from src.infra.create_time import Time
 from src.infra.logger import logger
 
+# Ресурсы, которые суммируются с текущими значениями пользователя
+_INCREMENT_FIELDS = ("coins", "common_seed", "epic_seed", "rare_seed", "water", "level")
+# Ресурсы, которые заменяются последним непустым значением
+_OVERRIDE_FIELDS = ("skin", "booster", "item", "pot")
+
+
+def _grant_values(items: Sequence[ProductItemModel]) -> dict:
+    """Свернуть наборы покупок в значения для одного UPDATE users.
+
+    Счётчики превращаются в атомарные ``column + delta``, строковые поля —
+    в последнее непустое значение (как при поштучном начислении).
+    """
+    values: dict = {}
+    for field in _INCREMENT_FIELDS:
+        delta = sum(getattr(item, field) or 0 for item in items)
+        if delta:
+            values[field] = getattr(UserModel, field) + delta
+    for field in _OVERRIDE_FIELDS:
+        for item in reversed(items):
+            value = getattr(item, field)
+            if value:
+                values[field] = value
+                break
+    values["last_update"] = Time.now()
+    return values
+
 
 class UnAddedProductRepository:
 
@@ -17,6 +46,8 @@ class UnAddedProductRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
 
     @staticmethod
     async def add(un_added_product: UnaddedProduct):
@@ -27,6 +58,8 @@ class UnAddedProductRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
 
     @staticmethod
     async def delete_one(id_un_added_gold: int):
@@ -37,3 +70,51 @@ class UnAddedProductRepository:
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
+
+    @staticmethod
+    async def grant_all(id_user: int) -> UserModel | None:
+        """Начислить все ожидающие покупки пользователя одной транзакцией.
+
+        Строки блокируются ``FOR UPDATE SKIP LOCKED``: параллельный запрос
+        того же пользователя их не увидит, поэтому двойного начисления нет.
+        Возвращает обновлённого пользователя или ``None``, если начислять нечего.
+        """
+        async with get_async_session() as session:
+            try:
+                rows = (
+                    await session.execute(
+                        select(UnaddedProduct.id, ProductItemModel)
+                        .join(ProductModel, ProductModel.id == UnaddedProduct.productId)
+                        .join(ProductItemModel, ProductItemModel.id == ProductModel.id_product_item)
+                        .where(UnaddedProduct.id_user == id_user)
+                        .order_by(UnaddedProduct.id)
+                        .with_for_update(of=UnaddedProduct, skip_locked=True)
+                    )
+                ).all()
+                if not rows:
+                    return None
+
+                pending_ids = [pending_id for pending_id, _item in rows]
+                items = [item for _pending_id, item in rows]
+
+                user = await session.scalar(
+                    update(UserModel)
+                    .where(UserModel.id == id_user)
+                    .values(**_grant_values(items))
+                    .returning(UserModel)
+                )
+                await session.execute(
+                    delete(UnaddedProduct).where(UnaddedProduct.id.in_(pending_ids))
+                )
+                # отсоединяем до commit, чтобы атрибуты не протухли
+                session.expunge(user)
+                await session.commit()
+                logger.info(f"Начислено покупок: {len(pending_ids)}, user_id={id_user}")
+                return user
+            except SQLAlchemyError as e:
+                logger.error(e)
+                await session.rollback()
+                if in_request_scope():
+                    raise
@@ -2,7 +2,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload
 
-from src.database.connection import get_async_session
+from src.database.connection import get_async_session, in_request_scope
 from src.database.models import UserModel
 from src.infra.logger import logger
 
@@ -20,6 +20,8 @@ class UserRepository():
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
 
     @staticmethod
     async def get(phone: str) -> UserModel | None:
@@ -34,3 +36,5 @@ class UserRepository():
             except SQLAlchemyError as e:
                 logger.error(e)
                 await session.rollback()
+                if in_request_scope():
+                    raise
@@ -45,6 +45,8 @@ class PurchaseHistoryItemSchema(BaseModel):
 
 class PurchaseHistoryListSchema(BaseModel):
     purchases: List[PurchaseHistoryItemSchema]
+    # курсор следующей страницы: передать как ``before``; None — страниц больше нет
+    next_before: Optional[str] = Field(None, alias="nextBefore")
 
     model_config = {
         "from_attributes": True,
@@ -0,0 +1,170 @@
+"""Постраничный обход лидерборда по ``next_after`` на живых Postgres и Redis.
+
+Нужны БД и Redis из config; если что-то недоступно, тесты пропускаются.
+Каждый тест создаёт свой ивент с игроками и удаляет их за собой.
+
+    python -m pytest -q tests/test_leaderboard_paging.py
+"""
+
+import secrets
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from redis.exceptions import RedisError
+from sqlalchemy import delete, text
+
+from src.api import events
+from src.database.connection import async_session_maker, engine
+from src.database.models import TokenModel, UserModel
+from src.events.leaderboard import RedisLeaderboard
+from src.events.leaderboard_cache import LeaderboardPageCache
+from src.events.models import EventModel, EventRatingModel
+from src.infra.create_time import Time
+from src.infra.radis import redis_client, redis_pool
+
+pytestmark = pytest.mark.anyio
+
+# 14 игроков, с равными результатами — порядок внутри них решает user_id
+RESULTS = [100.0, 90.0, 90.0, 90.0, 80.0, 70.5, 70.5, 60.0, 50.0, 40.0, 40.0, 30.0, 20.0, 10.0]
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def board():
+    """(event_id, токен игрока, ожидаемый порядок [(place, user_id, result)])."""
+    try:
+        await redis_client.ping()
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except (RedisError, OSError) as exc:
+        await engine.dispose()
+        await redis_pool.disconnect()
+        pytest.skip(f"Postgres/Redis недоступны: {exc}")
+
+    prefix = f"7{uuid.uuid4().int % 10**6:06d}"
+    now = Time.now()
+    async with async_session_maker() as session:
+        event = EventModel(
+            name="paging test",
+            event_type="score",
+            logo="",
+            start_date=now - timedelta(hours=1),
+            end_date=now + timedelta(hours=1),
+            level_ids=[],
+        )
+        users = [UserModel(phone=f"{prefix}{n:04d}") for n in range(len(RESULTS))]
+        session.add(event)
+        session.add_all(users)
+        await session.flush()
+        event_id, user_ids = event.id, [user.id for user in users]
+        # перемешиваем, чтобы порядок id не совпадал с порядком результатов
+        session.add_all(
+            EventRatingModel(event_id=event_id, user_id=user_id, result=result)
+            for user_id, result in zip(reversed(user_ids), RESULTS)
+        )
+        token = secrets.token_hex(20)
+        session.add(TokenModel(id_user=user_ids[0], token=token, expires_at=now + timedelta(hours=1)))
+        await session.commit()
+
+    ordered = sorted(zip(RESULTS, reversed(user_ids)), key=lambda row: (-row[0], row[1]))
+    expected = [(place, uid, result) for place, (result, uid) in enumerate(ordered, start=1)]
+    yield event_id, token, expected
+
+    async with async_session_maker() as session:
+        await session.execute(delete(EventRatingModel).where(EventRatingModel.event_id == event_id))
+        await session.execute(delete(TokenModel).where(TokenModel.id_user.in_(user_ids)))
+        await session.execute(delete(UserModel).where(UserModel.id.in_(user_ids)))
+        await session.execute(delete(EventModel).where(EventModel.id == event_id))
+        await session.commit()
+    await RedisLeaderboard.drop(event_id)
+    LeaderboardPageCache._local.clear()
+    # пулы привязаны к циклу событий теста
+    await engine.dispose()
+    await redis_pool.disconnect()
+
+
+@pytest.fixture(params=["redis", "db"])
+def backend(request, monkeypatch):
+    """Список вызовов ``rows_through``: курсор в Redis должен через него проходить."""
+    calls = []
+    if request.param == "db":
+        async def unavailable(event_id: int):
+            return None
+
+        # так же, как при ошибке Redis: страницы и места считаются по БД
+        monkeypatch.setattr(RedisLeaderboard, "is_ready", staticmethod(unavailable))
+        return None
+
+    rows_through = RedisLeaderboard.rows_through
+
+    async def spy(*args, **kwargs):
+        calls.append(args)
+        return await rows_through(*args, **kwargs)
+
+    monkeypatch.setattr(RedisLeaderboard, "rows_through", spy)
+    return calls
+
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+    app.include_router(events.router)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+
+
+async def _page(client, event_id: int, token: str, **params) -> httpx.Response:
+    return await client.get(
+        "/api/event/leaderboard",
+        params={"event_id": event_id, **params},
+        headers={"accessToken": token},
+    )
+
+
+@pytest.mark.parametrize("limit", [4, 7])
+async def test_pages_to_the_end_by_next_after(board, backend, client, limit):
+    event_id, token, expected = board
+    seen = []
+    params = {"limit": limit}
+    for _ in range(len(expected)):
+        response = await _page(client, event_id, token, **params)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        seen.extend((row["place"], row["user_id"], row["result"]) for row in body["top"])
+        if body["next_after"] is None:
+            assert body["next_offset"] is None
+            break
+        assert body["next_offset"] == len(seen)
+        params = {"limit": limit, "after": body["next_after"]}
+    else:
+        pytest.fail("next_after не привёл к последней странице")
+
+    assert seen == expected
+    if backend is not None:
+        # каждая страница после первой читалась из Redis по курсору
+        assert len(backend) == -(-len(expected) // limit) - 1
+    # полная последняя страница не обещает следующую
+    assert len(body["top"]) == (len(expected) % limit or limit)
+
+
+async def test_cursor_and_offset_must_agree(board, backend, client):
+    event_id, token, expected = board
+    first = (await _page(client, event_id, token, limit=4)).json()
+
+    same = await _page(client, event_id, token, limit=4, offset=4, after=first["next_after"])
+    assert same.status_code == 200
+    assert [row["place"] for row in same.json()["top"]] == [5, 6, 7, 8]
+
+    mismatched = await _page(client, event_id, token, limit=4, offset=0, after=first["next_after"])
+    assert mismatched.status_code == 422
+
+    malformed = await _page(client, event_id, token, limit=4, after="40.0,9")
+    assert malformed.status_code == 422
@@ -0,0 +1,169 @@
+"""Интеграционные тесты очереди колбэков оплаты на живом Redis.
+
+Нужен Redis из config (REDIS_HOST/REDIS_PORT); если он недоступен, тесты
+пропускаются. Каждый тест работает со своими stream/group, БД не трогается:
+``TransactionCore.process_callback`` подменяется записью вызовов.
+
+    python -m pytest -q tests/test_payment_queue.py
+"""
+
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from redis.exceptions import RedisError
+
+from src.api import beeline
+from src.business_logic import payment_queue
+from src.business_logic.payment_queue import PaymentCallbackQueue
+from src.business_logic.transaction import TransactionCore
+from src.infra.radis import redis_client, redis_pool
+from src.schemas.purchase import PurchaseStatus
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def streams(monkeypatch):
+    try:
+        await redis_client.ping()
+    except (RedisError, OSError) as exc:
+        pytest.skip(f"Redis недоступен: {exc}")
+
+    suffix = uuid.uuid4().hex[:8]
+    stream = f"test:payments:{suffix}"
+    dead = f"{stream}:dead"
+    monkeypatch.setattr(payment_queue, "STREAM", stream)
+    monkeypatch.setattr(payment_queue, "DEAD_LETTER_STREAM", dead)
+    monkeypatch.setattr(payment_queue, "GROUP", f"test-{suffix}")
+    monkeypatch.setattr(payment_queue, "PAYMENT_QUEUE_BLOCK_MS", 50)
+    yield stream, dead
+    await redis_client.delete(stream, dead)
+    # пул привязан к циклу событий теста
+    await redis_pool.disconnect()
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    """Подмена process_callback: список применённых purchaseId."""
+    calls = []
+
+    async def process_callback(purchase_id: str, status: str) -> None:
+        calls.append(purchase_id)
+
+    monkeypatch.setattr(TransactionCore, "process_callback", staticmethod(process_callback))
+    return calls
+
+
+def _callback(purchase_id: str = "p-1") -> PurchaseStatus:
+    return PurchaseStatus(id=purchase_id, status="success", productId=1, phone="79990001122", price=10)
+
+
+async def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not await predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("условие не выполнилось за отведённое время")
+        await asyncio.sleep(0.02)
+
+
+async def test_enqueue_consume_ack(streams, applied):
+    stream, _dead = streams
+    queue = PaymentCallbackQueue()
+
+    assert await queue.enqueue(_callback("p-1"))
+    assert await queue.enqueue(_callback("p-2"))
+    queue.start()
+    try:
+        await _wait_for(lambda: _async(len(applied) == 2))
+        await _wait_for(lambda: _xlen_is(stream, 0))
+    finally:
+        await queue.stop()
+
+    assert applied == ["p-1", "p-2"]
+    pending = await redis_client.xpending(stream, payment_queue.GROUP)
+    assert pending["pending"] == 0
+
+
+async def test_failing_callback_goes_to_dead_letter(streams, monkeypatch):
+    stream, dead = streams
+    monkeypatch.setattr(payment_queue, "PAYMENT_QUEUE_RETRY_IDLE_MS", 50)
+    monkeypatch.setattr(payment_queue, "PAYMENT_QUEUE_MAX_DELIVERIES", 2)
+    attempts = []
+
+    async def process_callback(purchase_id: str, status: str) -> None:
+        attempts.append(purchase_id)
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(TransactionCore, "process_callback", staticmethod(process_callback))
+    queue = PaymentCallbackQueue()
+
+    assert await queue.enqueue(_callback("p-bad"))
+    queue.start()
+    try:
+        await _wait_for(lambda: _xlen_is(dead, 1))
+    finally:
+        await queue.stop()
+
+    # первая доставка + повтор через XAUTOCLAIM, третья уходит в dead letter
+    assert attempts == ["p-bad", "p-bad"]
+    assert await redis_client.xlen(stream) == 0
+    [(_entry_id, fields)] = await redis_client.xrange(dead)
+    assert PurchaseStatus.model_validate_json(fields["payload"]).id == "p-bad"
+    assert fields["deliveries"] == "3"
+
+
+async def test_consumer_survives_unexpected_error(streams, applied, monkeypatch):
+    stream, _dead = streams
+    monkeypatch.setattr(payment_queue, "_BACKOFF_MIN", 0.01)
+    queue = PaymentCallbackQueue()
+    ensure_group = queue._ensure_group
+    failures = []
+
+    async def flaky_ensure_group() -> None:
+        if not failures:
+            failures.append(1)
+            raise ValueError("unexpected")
+        await ensure_group()
+
+    monkeypatch.setattr(queue, "_ensure_group", flaky_ensure_group)
+
+    assert await queue.enqueue(_callback("p-3"))
+    queue.start()
+    try:
+        await _wait_for(lambda: _async(applied == ["p-3"]))
+        assert not queue._task.done()
+    finally:
+        await queue.stop()
+
+
+async def test_full_backlog_rejects_callback_with_503(streams, monkeypatch):
+    stream, _dead = streams
+    monkeypatch.setattr(beeline, "PAYMENT_CALLBACK_MODE", "queue")
+    monkeypatch.setattr(payment_queue, "PAYMENT_QUEUE_MAX_BACKLOG", 1)
+    app = FastAPI()
+    app.include_router(beeline.router)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        accepted = await client.post("/api/game/pay-product", json=_callback("p-4").model_dump())
+        rejected = await client.post("/api/game/pay-product", json=_callback("p-5").model_dump())
+
+    assert accepted.status_code == 200
+    assert rejected.status_code == 503
+    assert await redis_client.xlen(stream) == 1
+
+
+async def _async(value):
+    return value
+
+
+async def _xlen_is(stream: str, expected: int) -> bool:
+    return await redis_client.xlen(stream) == expected